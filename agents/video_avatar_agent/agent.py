@@ -12,7 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import logging
 import os
+from typing import Any, Dict, List, Optional
 
 import google.auth
 from google.genai import types
@@ -21,105 +24,215 @@ from google.adk.agents import LlmAgent
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_response import LlmResponse
 from google.adk.models.llm_request import LlmRequest
-from google.adk.tools import AgentTool
+from google.adk.tools import BaseTool, ToolContext
 
 _, project_id = google.auth.default()
 os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id) # type: ignore
 os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
 os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
 
-from subagents import script_sequencer_agent, video_agent
-from utils.storage_utils import upload_data_to_gcs
+from context_compaction import compact_context_callback
+from orchestration import generate_video_segments, video_agent_tool
+from script_chunker import mark_rewritten_script, sequence_script
+from subagents import script_rewriter_agent
+from video_merge import ffmpeg_available, merge_video_segments
+from utils.agent_memo import MemoizedAgentTool
+from utils.image_utils import normalize_image
+from utils.metrics import record_model_response
+from utils.storage_utils import (
+    compute_content_hash,
+    run_in_io_thread,
+    upload_data_to_gcs_sync,
+)
+
+logger = logging.getLogger(__name__)
+
+# Content hashes of ingested user images, mapped to their GCS URIs.
+_ingested_images: Dict[str, str] = {}
+
+
+def _is_image(part: types.Part) -> bool:
+    inline_data = part.inline_data
+    return bool(
+        inline_data
+        and inline_data.data
+        and inline_data.mime_type
+        and inline_data.mime_type.startswith("image/")
+    )
+
+
+def _ingest_image_sync(agent_id: str, data: bytes, mime_type: str) -> str:
+    data, mime_type = normalize_image(data, mime_type)
+    return upload_data_to_gcs_sync(agent_id, data, mime_type)
+
+
+async def ingest_user_images(
+    agent_id: str,
+    parts: List[types.Part]
+) -> List[str]:
+    """Normalizes and uploads the inline images of a message.
+
+    Images are identified by the hash of their original bytes, so each
+    distinct image is normalized and uploaded once per process.
+    The missing images are uploaded concurrently.
+
+    Args:
+        agent_id (str): Agent id used as a folder name.
+        parts (List[types.Part]): Message parts.
+
+    Returns:
+        List[str]: GCS URIs of the images, in message order.
+    """
+    images = [part.inline_data for part in parts if _is_image(part)]
+    hashes = [compute_content_hash(image.data) for image in images] # type: ignore
+    missing = {
+        content_hash: image
+        for content_hash, image in zip(hashes, images)
+        if content_hash not in _ingested_images
+    }
+    urls = await asyncio.gather(*[
+        run_in_io_thread(
+            _ingest_image_sync,
+            agent_id,
+            image.data,
+            image.mime_type
+        )
+        for image in missing.values()
+    ])
+    _ingested_images.update(zip(missing.keys(), urls))
+    return [_ingested_images[content_hash] for content_hash in hashes]
 
 
 async def before_model_callback(
     callback_context: CallbackContext,
     llm_request: LlmRequest
 ) -> LlmResponse | None:
-    """The callback that ensures uploading user's images to GCS."""
-    persona_views_urls = callback_context.state.get("persona_views", [])
-    remove_indexes = []
-
-    upload_persona_views = len(persona_views_urls) == 0
+    """Replaces the user's images with their GCS URIs.
 
+    Images are ingested on the first model turn of a session. Later turns
+    reuse the URIs stored in the "persona_views" state.
+    """
     user_content = llm_request.contents[0]
-    for index, part in enumerate(user_content.parts): # type: ignore
-        inline_data = part.inline_data
-        if (
-            not inline_data
-            or not inline_data.data
-            or not inline_data.mime_type
-        ):
-            continue
-        if inline_data.mime_type.startswith("image/"):
-            if upload_persona_views:
-                image_url = await upload_data_to_gcs(
-                    callback_context.agent_name,
-                    inline_data.data,
-                    inline_data.mime_type
-                )
-                persona_views_urls.append(image_url)
-            remove_indexes.append(index)
-    remove_indexes.reverse()
-    for index in remove_indexes:
-        user_content.parts.pop(index) # type: ignore
-    user_content.parts.append( # type: ignore
+    persona_views_urls = callback_context.state.get("persona_views", None)
+    if persona_views_urls is None:
+        persona_views_urls = await ingest_user_images(
+            callback_context.agent_name,
+            user_content.parts or []
+        )
+        callback_context.state["persona_views"] = persona_views_urls
+    user_content.parts = [
+        part for part in user_content.parts or [] if not _is_image(part)
+    ]
+    user_content.parts.append(
         types.Part.from_text(
-            text="## VIEW IMAGE URLS\n" + "\n - ".join(persona_views_urls)
+            text="## VIEW IMAGE URLS\n" + "\n".join(
+                f"{index}. {url}"
+                for index, url in enumerate(persona_views_urls, start=1)
+            )
         )
     )
-    if upload_persona_views:
-        callback_context.state["persona_views"] = persona_views_urls
+
+
+def after_model_callback(
+    callback_context: CallbackContext,
+    llm_response: LlmResponse
+) -> LlmResponse | None:
+    record_model_response(callback_context.agent_name, llm_response)
+
+
+def after_tool_callback(
+    tool: BaseTool,
+    args: Dict[str, Any],
+    tool_context: ToolContext,
+    tool_response: Any
+) -> Optional[Dict]:
+    if tool.name == script_rewriter_agent.name:
+        mark_rewritten_script(tool_context)
+
+
+# `merge_video_segments` runs ffmpeg and ffprobe, which the ADK Cloud Run
+# image doesn't have. Without them, only the local merge command is offered.
+MERGE_AVAILABLE = ffmpeg_available()
+if MERGE_AVAILABLE:
+    MERGE_STEP = (
+        "5. After ALL video segments are generated, call "
+        "`merge_video_segments` with the URIs of all segments in the order "
+        "of the script chunks. Present the final video URL to the user."
+    )
+else:
+    logger.warning(
+        "ffmpeg or ffprobe is not installed, "
+        "`merge_video_segments` is not available."
+    )
+    MERGE_STEP = (
+        "5. After ALL video segments are generated, tell the user that "
+        "merging is not available in this deployment, and present "
+        "the Local Merge Command with the URIs of all segments "
+        "in the order of the script chunks."
+    )
 
 
 root_agent = LlmAgent(
     name="root_agent",
     model="gemini-2.5-pro",
-    instruction="""
+    instruction=f"""
     You are a video generation agent for avatar-based training videos. You orchestrate the creation of videos.
     Your input is a character description, a script, and a set of views of the character.
 
     **Steps**:
 
-    1. Start with `script_sequencer_agent`. It will split the script into smaller chunks and assign a view number to each chunk.
-    2. For each script chunk, use `video_agent` to create a video segment.
-    3. Present intermediate and final results to the user. The final result must be a numbered list of all videos in the order of the respective script chunks.
-    4. After ALL video segments are generated, provide a MERGE SCRIPT that the user can run to combine all videos into one.
+    1. Start with `sequence_script`. It splits the script into chunks of 6 to 8 seconds and assigns a view number to each chunk, reading the script from the user's message.
+       Only if the script is not written to be spoken literally (e.g. section headers, lists, math notation), first call `script_rewriter_agent` with the entire script, then call `sequence_script` without arguments to use the rewritten script.
+    2. Call `generate_video_segments` ONCE. It creates video segments for ALL script chunks concurrently and returns them in the order of the script chunks.
+    3. If some segments failed, use `video_agent` to re-create only those segments.
+    4. Present the final result to the user. The final result must be a numbered list of all videos in the order of the respective script chunks.
+    {MERGE_STEP}
 
     **Rules:**
 
-    -   Make sure to pass the entire Character Description and Video Shot Instructions to `video_agent` tool.
-    -   Pass view image URL and view number to `video_agent` tool.
-    -   You must present each generated video segment to the user, right after it is generated. Include the video url, the respective chunk number and the script chunk text in the message,
+    -   Make sure to pass the entire Character Description and Video Shot Instructions to `generate_video_segments` and `video_agent` tools.
+    -   When calling `video_agent` directly, write the request with these sections, each heading on its own line followed by its value:
+        ```
+        ## CHARACTER DESCRIPTION
+        <the entire Character Description>
+
+        ## VIDEO SHOT INSTRUCTIONS
+        <the entire Video Shot Instructions>
+
+        ## SCRIPT
+        <the script chunk>
+
+        ## VIEW NUMBER
+        <the view number of the chunk>
+
+        ## VIEW IMAGE URL
+        <the gs:// URL of that view>
+
+        ## VIDEO DURATION SECONDS
+        <the estimated duration of the chunk>
+        ```
+    -   Identical `video_agent` and `script_rewriter_agent` calls return the earlier result. If the user asks to regenerate a segment or script, call the tool with `force` set to true.
+    -   You must present each generated video segment to the user. Include the video url, the respective chunk number and the script chunk text in the message,
     -   When output "gs://" URIs to the user, replace "gs://" with "https://storage.mtls.cloud.google.com/".
         When calling any functions/tools, keep "gs://" URIs as they are.
 
-    **Final Merge Script:**
-    After presenting all video URLs, provide a bash script that:
-    1. Downloads all segments from GCS using gsutil
-    2. Creates a filelist.txt for ffmpeg
-    3. Merges them into a final video using ffmpeg
-
-    Example merge script format (replace URLs with actual generated URLs):
+    **Local Merge Command:**
+    After presenting the final result, provide a command that merges the same segments locally.
+    It downloads segments in parallel and merges them without re-encoding when possible:
     ```bash
-    #!/bin/bash
-    mkdir -p output
-    # Download segments
-    gsutil cp "gs://bucket/path/segment1.mp4" output/segment_01.mp4
-    gsutil cp "gs://bucket/path/segment2.mp4" output/segment_02.mp4
-    # ... repeat for all segments ...
-
-    # Create filelist
-    cd output
-    echo "file 'segment_01.mp4'" > filelist.txt
-    echo "file 'segment_02.mp4'" >> filelist.txt
-    # ... repeat for all segments ...
-
-    # Merge with ffmpeg
-    ffmpeg -y -f concat -safe 0 -i filelist.txt -c:v libx264 -c:a aac -movflags +faststart final_video.mp4
-    echo "Done! Final video: output/final_video.mp4"
+    python agents/video_avatar_agent/video_merge.py --output output/final_video.mp4 \\
+        "gs://bucket/path/segment1.mp4" \\
+        "gs://bucket/path/segment2.mp4"
     ```
     """.strip(),
-    tools=[AgentTool(script_sequencer_agent), AgentTool(video_agent)],
-    before_model_callback=before_model_callback,
+    tools=[
+        sequence_script,
+        MemoizedAgentTool(script_rewriter_agent),
+        generate_video_segments,
+        video_agent_tool,
+        *([merge_video_segments] if MERGE_AVAILABLE else []),
+    ],
+    before_model_callback=[before_model_callback, compact_context_callback],
+    after_model_callback=after_model_callback,
+    after_tool_callback=after_tool_callback,
 )
@@ -0,0 +1,244 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compaction of the root agent's context.
+
+Without compaction, the root agent's context grows with every segment:
+`sequence_script` returns all chunks, `generate_video_segments` returns
+every segment with its script text, `video_agent` calls carry the whole
+character description, and the model lists every segment URL.
+Once the model has responded to an exchange, only its outcome matters.
+
+`compact_context_callback` rewrites every exchange before the last model
+turn in the model request. The session events are not changed.
+- Segment results are replaced with a ledger of chunk id, URI and status.
+- `video_agent` results are replaced with their ledger entry.
+- `sequence_script` and `script_rewriter_agent` results become summaries.
+- Long string arguments of these calls are omitted.
+- Model messages that list segment URIs are replaced with the chunk ids
+  they presented.
+- Media parts are dropped.
+
+Compaction is deterministic, so the compacted history is the same on
+every turn and stays a stable prefix of the request.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from orchestration import extract_gcs_uri, parse_script_chunks
+from script_chunker import SCRIPT_CHUNKS_STATE_KEY
+from subagents import AUTHORIZED_URI, script_rewriter_agent, video_agent
+from utils.metrics import (
+    estimate_tokens,
+    record_compaction,
+    record_model_request,
+)
+
+# String arguments longer than this are omitted from compacted calls.
+COMPACT_ARG_CHARS = 200
+# Tools whose completed exchanges are compacted.
+COMPACTED_TOOLS = {
+    "sequence_script",
+    "generate_video_segments",
+    video_agent.name,
+    script_rewriter_agent.name,
+}
+
+_SCRIPT_SECTION_RE = re.compile(
+    r"## SCRIPT\s*\n(.*?)(?=\n\s*## |\Z)",
+    re.DOTALL
+)
+_GCS_URI_RE = re.compile(r"gs://[^\s\"'`<>()\[\]]+")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _ledger_entry(
+    chunk_id: Optional[int],
+    uri: str,
+    status: str
+) -> Dict[str, Any]:
+    return {"chunk_id": chunk_id, "uri": uri, "status": status}
+
+
+def _chunk_ids_by_script(state: Any) -> Dict[str, int]:
+    """Maps the script text of every chunk to its chunk id."""
+    try:
+        chunks = parse_script_chunks(state.get(SCRIPT_CHUNKS_STATE_KEY))
+    except ValueError:
+        return {}
+    return {
+        _normalize(chunk["script_chunk"]): chunk["chunk_id"]
+        for chunk in chunks
+    }
+
+
+def _compact_args(args: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: (
+            f"[{len(value)} characters omitted]"
+            if isinstance(value, str) and len(value) > COMPACT_ARG_CHARS
+            else value
+        )
+        for key, value in args.items()
+    }
+
+
+def _compact_response(
+    name: str,
+    response: Dict[str, Any],
+    args: Dict[str, Any],
+    chunk_ids: Dict[str, int]
+) -> Optional[Dict[str, Any]]:
+    """Returns the compacted response of a tool call,
+    or None to keep it as is."""
+    if name == "generate_video_segments" and "segments" in response:
+        return {
+            "segments": [
+                _ledger_entry(
+                    segment.get("chunk_id"),
+                    segment.get("uri", ""),
+                    segment.get("status", "")
+                )
+                for segment in response["segments"]
+            ]
+        }
+    if name == video_agent.name:
+        uri = extract_gcs_uri(str(response))
+        match = _SCRIPT_SECTION_RE.search(str(args.get("request", "")))
+        chunk_id = chunk_ids.get(_normalize(match.group(1))) if match else None
+        return {
+            "result": _ledger_entry(chunk_id, uri, "done" if uri else "error")
+        }
+    if name == "sequence_script" and "script_chunks" in response:
+        return {
+            "chunks": len(response["script_chunks"]),
+            "total_duration": response.get("total_duration"),
+        }
+    if name == script_rewriter_agent.name:
+        return {
+            "result": f"[Rewritten script of "
+                      f"{len(str(response.get('result', '')))} characters, "
+                      "stored for sequence_script]"
+        }
+    return None
+
+
+def _ledger_uris(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Segment URIs of a compacted response, mapped to their chunk ids."""
+    entries = response.get("segments") or [response.get("result")]
+    return {
+        entry["uri"]: entry["chunk_id"]
+        for entry in entries
+        if isinstance(entry, dict) and entry.get("uri")
+    }
+
+
+def _compact_text(text: str, segment_uris: Dict[str, Any]) -> str:
+    """Replaces a model message that lists segment URIs
+    with the chunk ids it presented."""
+    uris = [
+        uri.rstrip(".,;:*")
+        for uri in _GCS_URI_RE.findall(text.replace(AUTHORIZED_URI, "gs://"))
+    ]
+    chunk_ids = list(dict.fromkeys(
+        segment_uris[uri] for uri in uris if uri in segment_uris
+    ))
+    if not chunk_ids:
+        return text
+    presented = ", ".join(str(chunk_id) for chunk_id in chunk_ids)
+    return f"[Presented the video segments of chunks {presented}.]"
+
+
+def compact_contents(
+    contents: List[types.Content],
+    chunk_ids: Dict[str, int]
+) -> List[types.Content]:
+    """Compacts every exchange before the last model turn.
+
+    Args:
+        contents (List[types.Content]): Request contents, changed in place.
+        chunk_ids (Dict[str, int]): Chunk ids by normalized script text,
+            to identify the chunks of `video_agent` calls.
+
+    Returns:
+        List[types.Content]: The compacted contents.
+    """
+    last_model = max(
+        (i for i, content in enumerate(contents) if content.role == "model"),
+        default=-1
+    )
+    if last_model <= 0:
+        return contents
+    completed = contents[:last_model]
+    calls = {
+        part.function_call.id: part.function_call.args or {}
+        for content in completed
+        for part in content.parts or []
+        if part.function_call
+    }
+    segment_uris: Dict[str, Any] = {}
+    for content in completed:
+        for part in content.parts or []:
+            response = part.function_response
+            if not response or response.name not in COMPACTED_TOOLS:
+                continue
+            compacted = _compact_response(
+                response.name, # type: ignore
+                response.response or {},
+                calls.get(response.id, {}),
+                chunk_ids
+            )
+            if compacted is not None:
+                response.response = compacted
+                segment_uris.update(_ledger_uris(compacted))
+    for content in completed:
+        parts = []
+        for part in content.parts or []:
+            if part.inline_data or part.file_data:
+                continue
+            call = part.function_call
+            if call and call.name in COMPACTED_TOOLS:
+                call.args = _compact_args(call.args or {})
+            if content.role == "model" and part.text and not part.thought:
+                part.text = _compact_text(part.text, segment_uris)
+            parts.append(part)
+        content.parts = parts or [types.Part.from_text(text="[Media omitted]")]
+    return contents
+
+
+def compact_context_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest
+) -> LlmResponse | None:
+    """Compacts the root agent's context and records
+    the estimated input tokens before and after compaction."""
+    before = estimate_tokens(llm_request)
+    compact_contents(
+        llm_request.contents,
+        _chunk_ids_by_script(callback_context.state)
+    )
+    record_compaction(
+        callback_context.agent_name,
+        before,
+        estimate_tokens(llm_request)
+    )
+    record_model_request(callback_context.agent_name, llm_request)
@@ -0,0 +1,219 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from google.adk.tools import ToolContext
+
+from script_chunker import SCRIPT_CHUNKS_STATE_KEY
+from subagents import (
+    AUTHORIZED_URI,
+    VIEW_NUMBER_SECTION,
+    VIEW_URL_SECTION,
+    assigned_view_url,
+    regenerate_request,
+    save_media_artifact,
+    video_agent,
+)
+from utils.agent_memo import MemoizedAgentTool
+
+SEGMENTS_STATE_KEY = "video_segments"
+# Maximum number of script chunks being generated at the same time.
+SEGMENT_CONCURRENCY = int(os.environ.get("VIDEO_SEGMENT_CONCURRENCY", "4"))
+
+logger = logging.getLogger(__name__)
+
+_GCS_URI_RE = re.compile(r"gs://[^\s\"'`<>()\[\]]+")
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+def parse_script_chunks(value: Any) -> List[Dict[str, Any]]:
+    """Parses the output of `sequence_script` into a list of chunks.
+
+    Args:
+        value (Any): JSON list of chunks, either already decoded
+            or as text (optionally wrapped in a markdown code fence).
+
+    Returns:
+        List[Dict[str, Any]]: chunks ordered by `chunk_id`.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        fenced = _JSON_FENCE_RE.search(value)
+        if fenced:
+            value = fenced.group(1)
+        value = value.strip()
+        start, end = value.find("["), value.rfind("]")
+        if start < 0 or end < start:
+            raise ValueError("Script chunks must be a JSON list.")
+        value = json.loads(value[start:end + 1])
+    if not isinstance(value, list):
+        raise ValueError("Script chunks must be a JSON list.")
+    chunks = []
+    for position, chunk in enumerate(value, start=1):
+        if not isinstance(chunk, dict) or not chunk.get("script_chunk"):
+            continue
+        chunk = dict(chunk)
+        chunk["chunk_id"] = int(chunk.get("chunk_id") or position)
+        chunk["view_index"] = int(chunk.get("view_index") or 1)
+        chunks.append(chunk)
+    chunks.sort(key=lambda c: c["chunk_id"])
+    return chunks
+
+
+def extract_gcs_uri(text: str) -> str:
+    """Returns the first GCS URI mentioned in an agent response."""
+    text = (text or "").replace(AUTHORIZED_URI, "gs://")
+    match = _GCS_URI_RE.search(text)
+    return match.group(0).rstrip(".,;:*") if match else ""
+
+
+async def save_memoized_video(response: Any, tool_context: ToolContext):
+    """Saves the video of a memoized `video_agent` response to the
+    Artifact Store, as `extract_media_callback` does for new videos."""
+    uri = extract_gcs_uri(str(response))
+    if uri:
+        await save_media_artifact(tool_context, uri)
+
+
+def assigned_view_state(
+    args: Dict[str, Any],
+    tool_context: ToolContext
+) -> Dict[str, Any]:
+    """The session state a `video_agent` call reads: only the view
+    image it attaches, so editing other views keeps its memo entry."""
+    return {
+        "view": assigned_view_url(
+            str(args.get("request", "")),
+            tool_context.state.get("persona_views") or []
+        )
+    }
+
+
+# Only responses with a generated video are worth reusing. Forced calls
+# also skip the generation cache of the MCP server.
+video_agent_tool = MemoizedAgentTool(
+    video_agent,
+    key_state=assigned_view_state,
+    cache_if=lambda response: bool(extract_gcs_uri(str(response))),
+    replay=save_memoized_video,
+    force_args=regenerate_request,
+)
+
+
+def build_segment_request(
+    character_description: str,
+    video_shot_instructions: str,
+    chunk: Dict[str, Any],
+    view_url: Optional[str],
+) -> str:
+    """Builds the `video_agent` request for a single script chunk."""
+    sections = [
+        f"## CHARACTER DESCRIPTION\n{character_description.strip()}",
+        f"## VIDEO SHOT INSTRUCTIONS\n{video_shot_instructions.strip()}",
+        f"## SCRIPT\n{chunk['script_chunk'].strip()}",
+        f"{VIEW_NUMBER_SECTION}\n{chunk['view_index']}",
+    ]
+    if view_url:
+        sections.append(f"{VIEW_URL_SECTION}\n{view_url}")
+    duration = chunk.get("estimated_duration")
+    if duration:
+        sections.append(f"## VIDEO DURATION SECONDS\n{duration}")
+    return "\n\n".join(sections)
+
+
+async def generate_video_segments(
+    character_description: str,
+    video_shot_instructions: str,
+    tool_context: ToolContext,
+) -> Dict[str, Any]:
+    """Generates video segments for ALL script chunks produced by
+    `sequence_script`, running them concurrently.
+    Segments are returned in the order of the script chunks.
+
+    Args:
+        character_description (str): The entire Character Description.
+        video_shot_instructions (str): The entire Video Shot Instructions.
+
+    Returns:
+        Dict[str, Any]: `segments` list with `chunk_id`, `view_index`,
+            `script_chunk`, `uri`, `status` and `error` of every segment.
+    """
+    try:
+        chunks = parse_script_chunks(
+            tool_context.state.get(SCRIPT_CHUNKS_STATE_KEY)
+        )
+    except ValueError as e:
+        return {"error": f"Cannot parse script chunks: {e}"}
+    if not chunks:
+        return {
+            "error": "No script chunks found. Run `sequence_script` first."
+        }
+    persona_views = tool_context.state.get("persona_views", [])
+    semaphore = asyncio.Semaphore(max(1, SEGMENT_CONCURRENCY))
+
+    async def _generate_segment(chunk: Dict[str, Any]) -> Dict[str, Any]:
+        view_index = chunk["view_index"]
+        view_url = (
+            persona_views[view_index - 1]
+            if 0 < view_index <= len(persona_views)
+            else None
+        )
+        segment = {
+            "chunk_id": chunk["chunk_id"],
+            "view_index": view_index,
+            "script_chunk": chunk["script_chunk"],
+            "uri": "",
+            "status": "error",
+            "error": None,
+        }
+        request = build_segment_request(
+            character_description,
+            video_shot_instructions,
+            chunk,
+            view_url,
+        )
+        async with semaphore:
+            start = time.time()
+            try:
+                response = await video_agent_tool.run_async(
+                    args={"request": request},
+                    tool_context=tool_context,
+                )
+            except Exception as e: # one failed chunk must not stop the rest
+                logger.exception(f"Chunk {chunk['chunk_id']} failed.")
+                segment["error"] = str(e)
+                return segment
+        segment["uri"] = extract_gcs_uri(str(response))
+        if segment["uri"]:
+            segment["status"] = "done"
+        else:
+            segment["error"] = str(response) or "No video was generated."
+        logger.info(
+            f"Chunk {chunk['chunk_id']} took {int(time.time() - start)} seconds."
+        )
+        return segment
+
+    segments = await asyncio.gather(
+        *[_generate_segment(chunk) for chunk in chunks]
+    )
+    tool_context.state[SEGMENTS_STATE_KEY] = segments
+    return {"segments": segments}
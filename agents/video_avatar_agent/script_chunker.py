@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Splits a training script into video chunks, deterministically.
+
+The script is split into scenes at `[SCENE X | VIEW: viewN.png | ...]`
+markers (the view index is N, or X without a VIEW reference), or at
+paragraphs if there are no markers, with views assigned sequentially.
+Each scene is split into sentences, and sentences are grouped into
+chunks of MIN_CHUNK_SECONDS to MAX_CHUNK_SECONDS of speech. Chunks never
+span two scenes, and sentences are only broken (at clauses, then words)
+if a single sentence is longer than MAX_CHUNK_SECONDS.
+
+Speech duration is estimated from syllables (SYLLABLES_PER_SECOND) plus
+pauses at punctuation. The output has the same schema as the former
+`script_sequencer_agent` output: `chunk_id`, `script_chunk`, `view_index`
+and `estimated_duration` (6 or 8).
+
+Usage:
+    python agents/video_avatar_agent/script_chunker.py assets/prompt.md
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.tools import ToolContext
+
+SCRIPT_CHUNKS_STATE_KEY = "script_chunks"
+# Set by `script_rewriter_agent`, preferred over the user's script
+# in the same invocation, and cleared when it is used.
+REWRITTEN_SCRIPT_STATE_KEY = "rewritten_script"
+# Invocation in which the rewritten script was written.
+REWRITTEN_SCRIPT_INVOCATION_STATE_KEY = "rewritten_script_invocation"
+# Normal speaking pace is about 150 words (~4 syllables/s) per minute.
+SYLLABLES_PER_SECOND = float(
+    os.environ.get("SCRIPT_SYLLABLES_PER_SECOND", "4.0")
+)
+SENTENCE_PAUSE_SECONDS = 0.3
+CLAUSE_PAUSE_SECONDS = 0.15
+MIN_CHUNK_SECONDS = 6.0
+MAX_CHUNK_SECONDS = 8.0
+# Supported video durations, a chunk's estimate is rounded up to these.
+VIDEO_DURATIONS = [6, 8]
+
+_SCRIPT_RE = re.compile(r"\[SCRIPT START\](.*?)\[SCRIPT END\]", re.DOTALL)
+_MARKER_RE = re.compile(r"\**\[SCENE\s*(\d+)([^\]]*)\]\**", re.IGNORECASE)
+_VIEW_RE = re.compile(r"VIEW:\s*view\s*(\d+)", re.IGNORECASE)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+_CLAUSE_RE = re.compile(r"(?<=[,;:])\s+|\s+(?=[-–—]\s)")
+_TOKEN_RE = re.compile(r"[A-Za-z']+|\d+(?:[.,]\d+)?|[=+%²³×÷/<>]")
+_VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+_SYMBOL_SYLLABLES = {
+    "=": 2, "+": 1, "%": 2, "²": 1, "³": 1, "×": 1, "÷": 3, "/": 1,
+    "<": 3, ">": 4,
+}
+
+
+def count_syllables(word: str) -> int:
+    """Estimates the syllables of a word, number or math symbol."""
+    if word in _SYMBOL_SYLLABLES:
+        return _SYMBOL_SYLLABLES[word]
+    if word[0].isdigit():
+        # "12" is "twelve", "2024" is "twenty twenty-four".
+        digits = len(re.sub(r"\D", "", word))
+        return max(1, math.ceil(digits * 1.5))
+    word = word.lower().strip("'")
+    if len(word) <= 2:
+        # Letters and short words: "x", "of", "is".
+        return 1
+    syllables = len(_VOWEL_GROUP_RE.findall(word))
+    if word.endswith("e") and not word.endswith(("le", "ee")):
+        syllables -= 1
+    return max(1, syllables)
+
+
+def estimate_duration(text: str) -> float:
+    """Estimates the seconds it takes to speak a text."""
+    syllables = sum(count_syllables(t) for t in _TOKEN_RE.findall(text))
+    sentences = len(re.findall(r"[.!?]+", text))
+    clauses = len(re.findall(r"[,;:]|\s[-–—]\s", text))
+    return (
+        syllables / SYLLABLES_PER_SECOND
+        + sentences * SENTENCE_PAUSE_SECONDS
+        + clauses * CLAUSE_PAUSE_SECONDS
+    )
+
+
+def _clean(text: str) -> str:
+    """Removes markdown emphasis and headers, and joins lines."""
+    text = re.sub(r"^\s*#+\s*", "", text, flags=re.MULTILINE)
+    text = re.sub(r"\*+|_{2,}", "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def parse_scenes(script: str) -> List[Tuple[int, str]]:
+    """Splits a script into (view index, text) scenes.
+
+    Only the part between [SCRIPT START] and [SCRIPT END] is used if the
+    script contains them. Without scene markers, every paragraph is
+    a scene, and views are assigned sequentially.
+    """
+    match = _SCRIPT_RE.search(script)
+    if match:
+        script = match.group(1)
+    markers = list(_MARKER_RE.finditer(script))
+    if not markers:
+        paragraphs = [_clean(p) for p in re.split(r"\n\s*\n", script)]
+        return [
+            (index, text) for index, text in
+            enumerate([p for p in paragraphs if p], start=1)
+        ]
+    scenes = []
+    for marker, following in zip(markers, markers[1:] + [None]):
+        end = following.start() if following else len(script)
+        text = _clean(script[marker.end():end])
+        if not text:
+            continue
+        view = _VIEW_RE.search(marker.group(2))
+        scenes.append((int(view.group(1) if view else marker.group(1)), text))
+    return scenes
+
+
+def split_sentences(text: str) -> List[str]:
+    """Splits a scene into sentences, and sentences that are too long
+    to speak in MAX_CHUNK_SECONDS into clauses or word runs."""
+    units = []
+    for sentence in _SENTENCE_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if estimate_duration(sentence) <= MAX_CHUNK_SECONDS:
+            units.append(sentence)
+            continue
+        for clause in _group(_CLAUSE_RE.split(sentence)):
+            if estimate_duration(clause) <= MAX_CHUNK_SECONDS:
+                units.append(clause)
+                continue
+            words = clause.split()
+            parts = math.ceil(estimate_duration(clause) / MAX_CHUNK_SECONDS)
+            size = math.ceil(len(words) / parts)
+            units.extend(
+                " ".join(words[i:i + size])
+                for i in range(0, len(words), size)
+            )
+    return units
+
+
+def _group(units: List[str]) -> List[str]:
+    """Groups consecutive units into as few texts as possible,
+    each at most MAX_CHUNK_SECONDS long (single units excepted)."""
+    durations = [estimate_duration(unit) for unit in units]
+    return [
+        " ".join(units[start:end])
+        for start, end in _partition(durations, balance=False)
+    ]
+
+
+def _partition(
+    durations: List[float],
+    balance: bool = True
+) -> List[Tuple[int, int]]:
+    """Splits a sequence of units into consecutive [start, end) ranges.
+
+    No range is longer than MAX_CHUNK_SECONDS unless it is a single unit.
+    With `balance`, ranges shorter than MIN_CHUNK_SECONDS are avoided
+    where possible, and ranges close to MAX_CHUNK_SECONDS are preferred.
+    Without it, the number of ranges is minimized.
+    """
+    count = len(durations)
+    # best[j]: (cost, start of the last range) of the first j units.
+    best: List[Tuple[float, int]] = [(0.0, 0)] + [(math.inf, 0)] * count
+    for end in range(1, count + 1):
+        total = 0.0
+        for start in range(end - 1, -1, -1):
+            total += durations[start]
+            if total > MAX_CHUNK_SECONDS and start < end - 1:
+                break
+            if balance:
+                cost = (MAX_CHUNK_SECONDS - min(total, MAX_CHUNK_SECONDS)) ** 2
+                if total < MIN_CHUNK_SECONDS:
+                    cost += 100 * (MIN_CHUNK_SECONDS - total)
+            else:
+                cost = 1.0
+            cost += best[start][0]
+            if cost < best[end][0]:
+                best[end] = (cost, start)
+    ranges = []
+    end = count
+    while end > 0:
+        start = best[end][1]
+        ranges.append((start, end))
+        end = start
+    return ranges[::-1]
+
+
+def _rounded_duration(seconds: float) -> int:
+    for duration in VIDEO_DURATIONS:
+        if seconds <= duration:
+            return duration
+    return VIDEO_DURATIONS[-1]
+
+
+def chunk_script(script: str, num_views: int = 0) -> List[Dict[str, Any]]:
+    """Splits a script into chunks of 6 to 8 seconds of speech.
+
+    Args:
+        script (str): Training script, optionally with scene markers.
+        num_views (int, optional): Number of view images. View indexes
+            beyond it wrap around. Defaults to 0 (no limit).
+
+    Returns:
+        List[Dict[str, Any]]: chunks with `chunk_id`, `script_chunk`,
+            `view_index` and `estimated_duration`.
+    """
+    chunks = []
+    for view_index, text in parse_scenes(script):
+        if num_views > 0:
+            view_index = (view_index - 1) % num_views + 1
+        sentences = split_sentences(text)
+        durations = [estimate_duration(s) for s in sentences]
+        for start, end in _partition(durations):
+            chunk = " ".join(sentences[start:end])
+            chunks.append({
+                "chunk_id": len(chunks) + 1,
+                "script_chunk": chunk,
+                "view_index": view_index,
+                "estimated_duration": _rounded_duration(
+                    estimate_duration(chunk)
+                ),
+            })
+    return chunks
+
+
+def _user_text(tool_context: ToolContext) -> str:
+    content = tool_context.user_content
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+def mark_rewritten_script(tool_context: ToolContext):
+    """Ties the rewritten script to the current invocation.
+    Call after `script_rewriter_agent` has run as a tool."""
+    tool_context.state[REWRITTEN_SCRIPT_INVOCATION_STATE_KEY] = (
+        tool_context.invocation_id
+    )
+
+
+def _consume_rewritten_script(tool_context: ToolContext) -> Optional[str]:
+    """Returns the script rewritten in the current invocation, if any,
+    and clears it, so that later jobs don't reuse it."""
+    script = tool_context.state.get(REWRITTEN_SCRIPT_STATE_KEY)
+    if not script:
+        return None
+    current = (
+        tool_context.state.get(REWRITTEN_SCRIPT_INVOCATION_STATE_KEY)
+        == tool_context.invocation_id
+    )
+    tool_context.state[REWRITTEN_SCRIPT_STATE_KEY] = None
+    tool_context.state[REWRITTEN_SCRIPT_INVOCATION_STATE_KEY] = None
+    return script if current else None
+
+
+async def sequence_script(
+    tool_context: ToolContext,
+    script: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Splits the training script into chunks of 6 to 8 seconds of speech
+    and assigns a view number to each chunk. The chunks are stored for
+    `generate_video_segments`.
+
+    Args:
+        script (str, optional): The script to split. Leave empty to use
+            the script just rewritten by `script_rewriter_agent`, or else
+            the script in the user's message.
+
+    Returns:
+        Dict[str, Any]: `script_chunks` list with `chunk_id`,
+            `script_chunk`, `view_index` and `estimated_duration`,
+            and the `total_duration` in seconds.
+    """
+    rewritten_script = _consume_rewritten_script(tool_context)
+    script = script or rewritten_script or _user_text(tool_context)
+    chunks = chunk_script(
+        script,
+        len(tool_context.state.get("persona_views", []))
+    )
+    if not chunks:
+        return {"error": "The script is empty."}
+    tool_context.state[SCRIPT_CHUNKS_STATE_KEY] = chunks
+    return {
+        "script_chunks": chunks,
+        "total_duration": sum(c["estimated_duration"] for c in chunks),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Split a training script into video chunks."
+    )
+    parser.add_argument("script", help="Script or prompt file.")
+    parser.add_argument(
+        "--num-views",
+        type=int,
+        default=0,
+        help="Number of view images, 0 for no limit."
+    )
+    args = parser.parse_args()
+    with open(args.script, encoding="utf-8") as f:
+        chunks = chunk_script(f.read(), args.num_views)
+    print(json.dumps(chunks, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,9 +13,11 @@
 # limitations under the License.
 
 import json
+import logging
 import mimetypes
 import os
-from typing import Any, Dict, Optional
+import re
+from typing import Any, Dict, List, Optional
 import uuid
 
 from pydantic import BaseModel
@@ -31,9 +33,15 @@ from google.adk.tools.mcp_tool.mcp_session_manager import (
 )
 from google.genai import types
 
+from script_chunker import REWRITTEN_SCRIPT_STATE_KEY
 from utils.auth_provider import IdentityTokenHeaderProvider
+from utils.metrics import record_model_request, record_model_response
 from utils.utils import load_prompt_from_file
-from utils.storage_utils import download_data_from_gcs
+from utils.storage_utils import (
+    ai_bucket_name,
+    copy_gcs_object,
+    download_data_from_gcs,
+)
 
 mcp_server_url = os.environ.get(
     "MEDIA_MCP_SERVER_URL",
@@ -42,6 +50,35 @@ mcp_server_url = os.environ.get(
 if not mcp_server_url.endswith("/mcp"):
     mcp_server_url += "/mcp"
 
+# How generated media is saved to the Artifact Store:
+# - "reference": saves a reference to the existing GCS URI (default).
+# - "copy": copies the object server-side to ARTIFACT_BUCKET
+#   and saves a reference to the copy.
+# - "inline": downloads the media and saves its bytes.
+#   Memory usage grows with the media size.
+ARTIFACT_CAPTURE_MODE = os.environ.get(
+    "ARTIFACT_CAPTURE_MODE",
+    "reference"
+).lower()
+artifact_bucket_name = os.environ.get("ARTIFACT_BUCKET", ai_bucket_name)
+
+logger = logging.getLogger(__name__)
+
+AUTHORIZED_URI = "https://storage.mtls.cloud.google.com/"
+# Request sections that assign the starting frame to `video_agent`.
+VIEW_NUMBER_SECTION = "## VIEW NUMBER"
+VIEW_URL_SECTION = "## VIEW IMAGE URL"
+_VIEW_NUMBER_RE = re.compile(re.escape(VIEW_NUMBER_SECTION) + r"\s+(\d+)")
+_VIEW_URL_RE = re.compile(
+    re.escape(VIEW_URL_SECTION)
+    + r"\s+((?:gs://|" + re.escape(AUTHORIZED_URI) + r")\S+)"
+)
+# Request section of forced `video_agent` calls. Their media generation
+# calls skip the MCP server's generation cache.
+REGENERATE_SECTION = "## REGENERATE"
+# Media generation tools of the MCP server that accept `skip_cache`.
+CACHED_MEDIA_TOOLS = {"generate_image", "generate_video"}
+
 mcp_toolset_generate_image = McpToolset(
     connection_params=StreamableHTTPConnectionParams(
         url=mcp_server_url,
@@ -58,9 +95,21 @@ mcp_toolset_generate_video = McpToolset(
 )
 
 
+def regenerate_request(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Marks the request of a forced `video_agent` call
+    with the REGENERATE section."""
+    return {**args, "request": f"{args['request']}\n\n{REGENERATE_SECTION}"}
+
+
 def before_tool_callback(
     tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
 ) -> Optional[Dict]:
+    request = tool_context.user_content
+    if tool.name in CACHED_MEDIA_TOOLS and request and any(
+        REGENERATE_SECTION in (part.text or "")
+        for part in request.parts or []
+    ):
+        args["skip_cache"] = True
     print(f"======== Calling a tool: {tool.name}. Arguments: {args}")
 
 
@@ -88,37 +137,108 @@ async def extract_media_callback(
     if isinstance(response, dict):
         uri = response.get("uri", "")
         if uri and uri.startswith("gs://"):
-            await tool_context.save_artifact(
-                filename=uuid.uuid4().hex,
-                artifact=types.Part(inline_data=download_data_from_gcs(uri))
+            await save_media_artifact(tool_context, uri)
+
+
+async def save_media_artifact(tool_context: ToolContext, uri: str):
+    """Saves a GCS media object to the Artifact Store
+    according to ARTIFACT_CAPTURE_MODE."""
+    filename = uuid.uuid4().hex
+    if ARTIFACT_CAPTURE_MODE == "inline":
+        await tool_context.save_artifact(
+            filename=filename,
+            artifact=types.Part(inline_data=await download_data_from_gcs(uri))
+        )
+        return
+    if ARTIFACT_CAPTURE_MODE == "copy":
+        ext = os.path.splitext(uri)[1]
+        uri = await copy_gcs_object(
+            uri,
+            artifact_bucket_name,
+            f"artifacts/{tool_context.agent_name}/{filename}{ext}"
+        )
+    try:
+        await tool_context.save_artifact(
+            filename=filename,
+            artifact=types.Part(
+                file_data=types.FileData(
+                    file_uri=uri,
+                    mime_type=(
+                        mimetypes.guess_type(uri)[0]
+                        or "application/octet-stream"
+                    ),
+                )
             )
+        )
+    except NotImplementedError:
+        # Some artifact services (e.g. GcsArtifactService)
+        # cannot store references, so store the URI as text.
+        await tool_context.save_artifact(
+            filename=filename,
+            artifact=types.Part.from_text(text=uri)
+        )
+
+def assigned_view_url(
+    request: str,
+    persona_views: List[str]
+) -> Optional[str]:
+    """Returns the view image assigned in a `video_agent` request:
+    the VIEW IMAGE URL section, or else the VIEW NUMBER section
+    resolved against the persona views."""
+    match = _VIEW_URL_RE.search(request)
+    if match:
+        return match.group(1).replace(AUTHORIZED_URI, "gs://")
+    match = _VIEW_NUMBER_RE.search(request)
+    if match and 0 < int(match.group(1)) <= len(persona_views):
+        return persona_views[int(match.group(1)) - 1]
+    return None
+
 
 async def before_model_callback(
     callback_context: CallbackContext,
     llm_request: LlmRequest
 ) -> LlmResponse | None:
-    """The callback that ensures uploading user's images to GCS."""
-    persona_views = callback_context.state.get("persona_views", None)
-    if not persona_views:
-        return
-    user_content = llm_request.contents[-1]
-    for url in persona_views:
-        print(f"#### Added image: {url}")
-        user_content.parts.append( # type: ignore
+    """Attaches the view image assigned in the request as the starting
+    frame. Requests without an assigned view get no image."""
+    persona_views = callback_context.state.get("persona_views", None) or []
+    request_content = llm_request.contents[0] if llm_request.contents else None
+    request = "\n".join(
+        part.text for part in (request_content.parts or []) if part.text
+    ) if request_content else ""
+    view_url = assigned_view_url(request, persona_views)
+    if view_url and request_content:
+        request_content.parts.append( # type: ignore
             types.Part.from_uri(
-                file_uri=url,
-                mime_type=mimetypes.guess_type(url)[0],
+                file_uri=view_url,
+                mime_type=mimetypes.guess_type(view_url)[0],
             )
         )
+    elif not view_url:
+        logger.warning(
+            f"No view assigned in the {callback_context.agent_name} request, "
+            f"expected a {VIEW_URL_SECTION} or {VIEW_NUMBER_SECTION} section."
+        )
+    record_model_request(callback_context.agent_name, llm_request)
+
+
+def after_model_callback(
+    callback_context: CallbackContext,
+    llm_response: LlmResponse
+) -> LlmResponse | None:
+    record_model_response(callback_context.agent_name, llm_response)
+
 
-script_sequencer_agent = Agent(
+script_rewriter_agent = Agent(
     model="gemini-2.5-pro",
-    name="script_sequencer_agent",
-    description="""Script Sequencer Agent.
+    name="script_rewriter_agent",
+    description="""Script Rewriter Agent.
+    Rewrites a training script to sound natural when spoken,
+    keeping its scene markers.
     Input:
     1. Training script.
     """,
-    instruction=load_prompt_from_file("script_sequencer_agent.md"),
+    instruction=load_prompt_from_file("script_rewriter_agent.md"),
+    output_key=REWRITTEN_SCRIPT_STATE_KEY,
 )
 
 video_agent = Agent(
@@ -135,5 +255,7 @@ video_agent = Agent(
     tools=[mcp_toolset_generate_video],
     after_tool_callback=extract_media_callback,
     before_tool_callback=before_tool_callback,
+    before_model_callback=before_model_callback,
+    after_model_callback=after_model_callback,
 )
 
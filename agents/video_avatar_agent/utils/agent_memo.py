@@ -0,0 +1,362 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Persistent memoization of sub-agent calls.
+
+`MemoizedAgentTool` is an `AgentTool` whose results are stored under
+a hash of everything the sub-agent's answer depends on:
+- the tool arguments (the request text),
+- content hashes of GCS media referenced in the request or in the
+  session state the call reads (not their URIs),
+- the model name,
+- the agent instruction, i.e. the prompt file content loaded with
+  `load_prompt_from_file`, so editing a prompt `.md` invalidates
+  its entries.
+
+A hit returns the stored result and replays the state changes of the
+original call, without running the sub-agent. Side effects of the
+sub-agent that a hit skips, such as saved artifacts, are re-created
+with the `replay` hook. Results that reference GCS objects are only
+reused while those objects exist. Calls with `force` set to true skip
+the lookup and replace the stored result. The `force_args` hook passes
+the bypass on to the sub-agent, e.g. to skip its own caches.
+"""
+
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from google.api_core import exceptions
+from google.adk.agents import BaseAgent
+from google.adk.tools import AgentTool, ToolContext
+from google.genai import types
+
+from utils.storage_utils import (
+    ai_bucket_name,
+    gcs_object_exists,
+    get_gcs_content_hash,
+    run_in_io_thread,
+    storage_client,
+)
+
+# Bump to invalidate all entries after changing what is stored.
+MEMO_VERSION = 1
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600.0 # 30 days
+# Tool argument that bypasses the memo.
+FORCE_ARG = "force"
+
+logger = logging.getLogger(__name__)
+
+_GCS_URI_RE = re.compile(r"gs://[^\s\"'`<>()\[\]]+")
+
+
+class MemoStore(ABC):
+    """Persistent key-value store of memoized results."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def put(self, key: str, record: Dict[str, Any]):
+        ...
+
+
+class FileMemoStore(MemoStore):
+    """Directory of JSON files, one per key."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path(key).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, key: str, record: Dict[str, Any]):
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+        tmp_path.write_text(json.dumps(record))
+        tmp_path.replace(path)
+
+
+class GcsMemoStore(MemoStore):
+    """JSON objects in a GCS bucket, one per key."""
+
+    def __init__(self, bucket_name: str, prefix: str = "cache/agent_memo"):
+        self.bucket = storage_client.bucket(bucket_name)
+        self.prefix = prefix.strip("/")
+
+    def _blob_name(self, key: str) -> str:
+        return f"{self.prefix}/{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = self.bucket.blob(self._blob_name(key)).download_as_bytes(
+                client=storage_client
+            )
+        except exceptions.NotFound:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    def put(self, key: str, record: Dict[str, Any]):
+        self.bucket.blob(self._blob_name(key)).upload_from_string(
+            json.dumps(record),
+            content_type="application/json",
+            client=storage_client,
+        )
+
+
+def create_memo_store(uri: str) -> Optional[MemoStore]:
+    """Creates a memo store from a URI.
+
+    Supported URIs are "file:///path/to/dir" and "gs://bucket/prefix".
+    "none" disables memoization.
+    """
+    if not uri or uri.lower() == "none":
+        return None
+    if uri.startswith("file://"):
+        return FileMemoStore(uri[len("file://"):])
+    if uri.startswith("gs://"):
+        bucket_name, _, prefix = uri[len("gs://"):].partition("/")
+        return GcsMemoStore(bucket_name, prefix or "cache/agent_memo")
+    raise ValueError(f"Unsupported agent memo URI: {uri}")
+
+
+default_memo_store = create_memo_store(
+    os.environ.get(
+        "AGENT_MEMO_URI",
+        f"gs://{ai_bucket_name}/cache/agent_memo"
+    )
+)
+
+
+def _gcs_uris(value: Any) -> List[str]:
+    """GCS URIs mentioned in a value, in order of first mention."""
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    uris = [uri.rstrip(".,;:*") for uri in _GCS_URI_RE.findall(text)]
+    return list(dict.fromkeys(uris))
+
+
+async def _media_hash(uri: str) -> str:
+    try:
+        return await get_gcs_content_hash(uri)
+    except exceptions.NotFound:
+        return f"uri:{uri}"
+
+
+class MemoizedAgentTool(AgentTool):
+    """An `AgentTool` that reuses results of identical earlier calls.
+
+    Args:
+        agent (BaseAgent): The agent to wrap.
+        skip_summarization (bool, optional): See `AgentTool`.
+        key_state (Callable[[Dict[str, Any], ToolContext], Any], optional):
+            Returns the session state that a call reads (e.g. in
+            callbacks), part of the key. Defaults to no state.
+        cache_if (Callable[[Any], bool], optional): Decides whether
+            a result is stored. Defaults to non-empty results.
+        store (Optional[MemoStore], optional): Defaults to the store
+            configured with AGENT_MEMO_URI. None disables memoization.
+        ttl_seconds (float, optional): Maximum age of reused results.
+            Defaults to AGENT_MEMO_TTL_SECONDS or 30 days.
+        replay (Callable[[Any, ToolContext], Awaitable[None]], optional):
+            Called with the stored result on a hit, to re-create side
+            effects of the sub-agent, e.g. saving artifacts.
+        force_args (Callable[[Dict[str, Any]], Dict[str, Any]], optional):
+            Rewrites the arguments of forced calls before they are passed
+            to the sub-agent. The key uses the original arguments.
+    """
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        skip_summarization: bool = False,
+        key_state: Optional[
+            Callable[[Dict[str, Any], ToolContext], Any]
+        ] = None,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+        store: Optional[MemoStore] = default_memo_store,
+        ttl_seconds: float = float(
+            os.environ.get("AGENT_MEMO_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+        ),
+        replay: Optional[Callable[[Any, ToolContext], Awaitable[None]]] = None,
+        force_args: Optional[
+            Callable[[Dict[str, Any]], Dict[str, Any]]
+        ] = None,
+    ):
+        super().__init__(agent, skip_summarization)
+        self._key_state = key_state
+        self._cache_if = cache_if or bool
+        self._store = store
+        self._ttl_seconds = ttl_seconds
+        self._replay = replay
+        self._force_args = force_args
+
+    def _get_declaration(self) -> types.FunctionDeclaration:
+        declaration = super()._get_declaration()
+        if self._store is None:
+            return declaration
+        description = (
+            "Set to true to run again instead of reusing the result of "
+            "an identical earlier call, e.g. when the user asks for "
+            "a new version."
+        )
+        parameters = declaration.parameters
+        if parameters and parameters.properties is not None:
+            parameters.properties[FORCE_ARG] = types.Schema(
+                type=types.Type.BOOLEAN,
+                description=description,
+            )
+        elif isinstance(declaration.parameters_json_schema, dict):
+            declaration.parameters_json_schema.setdefault(
+                "properties", {}
+            )[FORCE_ARG] = {"type": "boolean", "description": description}
+        return declaration
+
+    def _agent_fingerprint(self) -> Dict[str, Any]:
+        model = getattr(self.agent, "model", "")
+        instruction = getattr(self.agent, "instruction", "")
+        return {
+            "agent": self.agent.name,
+            "model": model if isinstance(model, str) else model.model,
+            # Callable instructions can't be hashed by content.
+            "instruction": (
+                instruction if isinstance(instruction, str)
+                else getattr(instruction, "__qualname__", repr(instruction))
+            ),
+        }
+
+    async def make_key(
+        self,
+        args: Dict[str, Any],
+        tool_context: ToolContext
+    ) -> str:
+        """Computes the memo key of a call. Referenced GCS media are
+        replaced with their content hashes, so the key doesn't change
+        when identical media are uploaded under another name."""
+        state = (
+            self._key_state(args, tool_context) if self._key_state else None
+        )
+        inputs = json.dumps(
+            {"args": args, "state": state},
+            sort_keys=True,
+            default=str
+        )
+        hashes = {uri: await _media_hash(uri) for uri in _gcs_uris(inputs)}
+
+        def _content(match: re.Match) -> str:
+            uri = match.group(0).rstrip(".,;:*")
+            return hashes.get(uri, uri) + match.group(0)[len(uri):]
+
+        canonical = json.dumps(
+            {
+                "version": MEMO_VERSION,
+                **self._agent_fingerprint(),
+                "inputs": _GCS_URI_RE.sub(_content, inputs),
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        record = await run_in_io_thread(self._store.get, key) # type: ignore
+        if (
+            not record
+            or time.time() - record.get("created", 0) > self._ttl_seconds
+        ):
+            return None
+        for uri in _gcs_uris(record.get("result")):
+            if not await gcs_object_exists(uri):
+                return None
+        return record
+
+    async def run_async(
+        self,
+        *,
+        args: Dict[str, Any],
+        tool_context: ToolContext,
+    ) -> Any:
+        args = dict(args)
+        force = bool(args.pop(FORCE_ARG, False))
+        run_args = (
+            self._force_args(args) if force and self._force_args else args
+        )
+        if self._store is None:
+            return await super().run_async(
+                args=run_args,
+                tool_context=tool_context
+            )
+        try:
+            key = await self.make_key(args, tool_context)
+            record = None if force else await self._lookup(key)
+        except Exception as e: # the memo must never fail a call
+            logger.warning(f"Agent memo lookup failed for {self.name}: {e}")
+            return await super().run_async(
+                args=run_args,
+                tool_context=tool_context
+            )
+        if record:
+            logger.info(f"Agent memo hit for {self.name}: {key}")
+            if self.skip_summarization:
+                tool_context.actions.skip_summarization = True
+            tool_context.state.update(record.get("state_delta", {}))
+            if self._replay:
+                try:
+                    await self._replay(record["result"], tool_context)
+                except Exception as e:
+                    logger.warning(
+                        f"Agent memo replay failed for {self.name}: {e}"
+                    )
+            return record["result"]
+        before = dict(tool_context.actions.state_delta)
+        result = await super().run_async(
+            args=run_args,
+            tool_context=tool_context
+        )
+        if not self._cache_if(result):
+            return result
+        state_delta = {
+            k: v for k, v in tool_context.actions.state_delta.items()
+            if k not in before or before[k] != v
+        }
+        try:
+            await run_in_io_thread(
+                self._store.put,
+                key,
+                {
+                    "agent": self.name,
+                    "created": time.time(),
+                    "result": result,
+                    "state_delta": state_delta,
+                }
+            )
+        except Exception as e:
+            logger.warning(f"Agent memo store failed for {self.name}: {e}")
+        return result
@@ -0,0 +1,54 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Long-lived, connection-pooled Storage client of the agent.
+
+Creating a client per request pays for authentication and TLS handshakes
+every time. The client is created once per process and keeps its HTTP
+connections alive between calls. Models are called through ADK, which
+manages its own GenAI client.
+"""
+
+import os
+import threading
+from typing import Optional
+
+from google.cloud.storage import Client as StorageClient
+from requests.adapters import HTTPAdapter
+
+# Number of pooled connections per client.
+CLIENT_POOL_SIZE = int(os.environ.get("CLIENT_POOL_SIZE", "64"))
+
+_lock = threading.Lock()
+_storage_client: Optional[StorageClient] = None
+
+
+def get_storage_client() -> StorageClient:
+    """Returns the process-wide Cloud Storage client."""
+    global _storage_client
+    if _storage_client is None:
+        with _lock:
+            if _storage_client is None:
+                client = StorageClient(
+                    project=os.environ.get("GOOGLE_CLOUD_PROJECT")
+                )
+                # Keep enough connections alive for concurrent requests.
+                client._http.mount(
+                    "https://",
+                    HTTPAdapter(
+                        pool_connections=CLIENT_POOL_SIZE,
+                        pool_maxsize=CLIENT_POOL_SIZE
+                    )
+                )
+                _storage_client = client
+    return _storage_client
@@ -0,0 +1,80 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Normalization of user images before they are uploaded."""
+
+import io
+import os
+from typing import Tuple
+
+from PIL import Image, ImageOps
+
+# Resolution of generated videos. Larger images are downscaled to fit it,
+# rotated for portrait images.
+VIDEO_RESOLUTION = tuple(
+    int(v) for v in os.environ.get("VIDEO_RESOLUTION", "1280x720").split("x")
+)
+VIEW_IMAGE_JPEG_QUALITY = int(os.environ.get("VIEW_IMAGE_JPEG_QUALITY", "90"))
+
+
+def _has_transparency(image: Image.Image) -> bool:
+    if image.mode in ("RGBA", "LA", "PA"):
+        return image.getchannel("A").getextrema()[0] < 255
+    return "transparency" in image.info
+
+
+def normalize_image(data: bytes, mime_type: str) -> Tuple[bytes, str]:
+    """Downscales an image to the video resolution and recompresses it.
+
+    Opaque images are saved as JPEG (VIEW_IMAGE_JPEG_QUALITY), images
+    with transparency as optimized PNG. Images are never upscaled.
+
+    Args:
+        data (bytes): Image bytes.
+        mime_type (str): Image MIME type.
+
+    Returns:
+        Tuple[bytes, str]: The image bytes and MIME type. The original
+            image if it can't be decoded, or if it already fits the video
+            resolution and recompressing it doesn't make it smaller.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (OSError, Image.DecompressionBombError):
+        return data, mime_type
+    image = ImageOps.exif_transpose(image)
+    long_side, short_side = max(VIDEO_RESOLUTION), min(VIDEO_RESOLUTION)
+    box = (
+        (long_side, short_side) if image.width >= image.height
+        else (short_side, long_side)
+    )
+    resized = image.width > box[0] or image.height > box[1]
+    if resized:
+        image.thumbnail(box, Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    if _has_transparency(image):
+        image.convert("RGBA").save(buffer, "PNG", optimize=True)
+        normalized_type = "image/png"
+    else:
+        image.convert("RGB").save(
+            buffer,
+            "JPEG",
+            quality=VIEW_IMAGE_JPEG_QUALITY,
+            optimize=True
+        )
+        normalized_type = "image/jpeg"
+    normalized = buffer.getvalue()
+    if not resized and len(normalized) >= len(data):
+        return data, mime_type
+    return normalized, normalized_type
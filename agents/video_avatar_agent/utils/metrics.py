@@ -0,0 +1,118 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per-agent counters of model request sizes.
+
+Callbacks record the image parts of every model request and the input
+tokens reported in its response, so changes to what is sent to the
+model can be measured. Counters are per process.
+"""
+
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+import json
+import logging
+from typing import Dict
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+# Rough token counts for estimates without a count_tokens call.
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 258
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelRequestMetrics:
+    requests: int = 0
+    image_parts: int = 0
+    input_tokens: int = 0
+    # Requests whose response reported token usage.
+    measured_requests: int = 0
+    # Estimated input tokens of compacted requests.
+    tokens_before_compaction: int = 0
+    tokens_after_compaction: int = 0
+
+
+_metrics: Dict[str, ModelRequestMetrics] = defaultdict(ModelRequestMetrics)
+
+
+def count_image_parts(llm_request: LlmRequest) -> int:
+    """Counts inline and referenced images in a model request."""
+    count = 0
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            data = part.inline_data or part.file_data
+            if data and (data.mime_type or "").startswith("image/"):
+                count += 1
+    return count
+
+
+def estimate_tokens(llm_request: LlmRequest) -> int:
+    """Estimates the input tokens of a model request's contents."""
+    chars = 0
+    media = 0
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(json.dumps(part.function_call.args, default=str))
+            elif part.function_response:
+                chars += len(
+                    json.dumps(part.function_response.response, default=str)
+                )
+            elif part.inline_data or part.file_data:
+                media += 1
+    return chars // CHARS_PER_TOKEN + media * IMAGE_TOKENS
+
+
+def record_model_request(agent_name: str, llm_request: LlmRequest):
+    """Records a model request, call after the request is final."""
+    image_parts = count_image_parts(llm_request)
+    metrics = _metrics[agent_name]
+    metrics.requests += 1
+    metrics.image_parts += image_parts
+    logger.info(f"{agent_name} model request: {image_parts} image part(s).")
+
+
+def record_model_response(agent_name: str, llm_response: LlmResponse):
+    """Records the input tokens reported for a model request."""
+    usage = llm_response.usage_metadata
+    if not usage or usage.prompt_token_count is None:
+        return
+    metrics = _metrics[agent_name]
+    metrics.input_tokens += usage.prompt_token_count
+    metrics.measured_requests += 1
+    logger.info(
+        f"{agent_name} model request: "
+        f"{usage.prompt_token_count} input tokens."
+    )
+
+
+def record_compaction(agent_name: str, before: int, after: int):
+    """Records the estimated input tokens of a request
+    before and after compaction."""
+    metrics = _metrics[agent_name]
+    metrics.tokens_before_compaction += before
+    metrics.tokens_after_compaction += after
+    logger.info(
+        f"{agent_name} context compacted: ~{before} -> ~{after} tokens."
+    )
+
+
+def get_model_metrics() -> Dict[str, Dict[str, int]]:
+    """Returns the counters of all agents."""
+    return {name: asdict(metrics) for name, metrics in _metrics.items()}
@@ -0,0 +1,581 @@
+#!/usr/bin/env python
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Merges video segments into a single video.
+
+Segments are downloaded in parallel and probed with ffprobe. Segments
+whose stream parameters match the majority are concatenated losslessly
+(stream copy), and only mismatched segments are re-encoded to match.
+
+A manifest in the work directory records every segment by content hash,
+so re-merging after a few segments changed only downloads, probes and
+re-encodes those segments, followed by a stream-copy remux.
+
+The agent tool keeps one work directory per session under MERGE_WORK_ROOT
+for re-merges within the session. The final video is deleted once it is
+uploaded. Directories of other sessions are evicted when they have been
+idle for MERGE_WORK_DIR_TTL_SECONDS, and least recently used first when
+all of them exceed MERGE_WORK_ROOT_MAX_MB, because /tmp is in memory
+on Cloud Run.
+
+GCS and ADK modules are only imported for GCS segments and the agent
+tool, so merging local files needs neither credentials nor ADK.
+
+Usage:
+    python agents/video_avatar_agent/video_merge.py \\
+        --output output/final_video.mp4 gs://bucket/segment1.mp4 ...
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from google.adk.tools import ToolContext
+
+DOWNLOAD_CONCURRENCY = int(os.environ.get("SEGMENT_DOWNLOAD_CONCURRENCY", "8"))
+FFMPEG = os.environ.get("FFMPEG_PATH", "ffmpeg")
+FFPROBE = os.environ.get("FFPROBE_PATH", "ffprobe")
+HASH_CHUNK_SIZE = 8 * 1024 * 1024 # 8 MB
+MANIFEST_FILE_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+MERGE_WORK_ROOT = Path(
+    os.environ.get(
+        "MERGE_WORK_ROOT",
+        Path(tempfile.gettempdir()) / "video_merge"
+    )
+)
+MERGE_WORK_DIR_TTL_SECONDS = float(
+    os.environ.get("MERGE_WORK_DIR_TTL_SECONDS", "900")
+)
+MERGE_WORK_ROOT_MAX_BYTES = int(
+    os.environ.get("MERGE_WORK_ROOT_MAX_MB", "512")
+) * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+_VIDEO_ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+    "vp9": "libvpx-vp9",
+    "av1": "libaom-av1",
+}
+_H264_PROFILES = {
+    "Baseline": "baseline",
+    "Constrained Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+    "High 10": "high10",
+    "High 4:2:2": "high422",
+    "High 4:4:4 Predictive": "high444",
+}
+_AUDIO_ENCODERS = {
+    "aac": "aac",
+    "opus": "libopus",
+    "mp3": "libmp3lame",
+}
+# Locks of session work directories, so that merges of the same session
+# don't race on the manifest and the output.
+_work_dir_locks: Dict[Path, asyncio.Lock] = {}
+
+
+@dataclass(frozen=True)
+class StreamParams:
+    """Stream parameters that must match for lossless concatenation."""
+    video_codec: str
+    video_profile: Optional[str]
+    width: int
+    height: int
+    pix_fmt: str
+    frame_rate: str
+    time_base: str
+    audio_codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+
+
+@dataclass
+class SegmentInfo:
+    path: Path
+    params: StreamParams
+    duration: float
+
+
+async def _run(*args: str) -> str:
+    """Runs a command and returns its standard output."""
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"{Path(args[0]).name} failed ({process.returncode}): "
+            f"{stderr.decode(errors='replace').strip()}"
+        )
+    return stdout.decode()
+
+
+def ffmpeg_available() -> bool:
+    """Checks whether ffmpeg and ffprobe are installed."""
+    return bool(shutil.which(FFMPEG) and shutil.which(FFPROBE))
+
+
+async def probe_segment(path: Path) -> SegmentInfo:
+    """Reads stream parameters and duration of a video file."""
+    output = await _run(
+        FFPROBE,
+        "-v", "error",
+        "-print_format", "json",
+        "-show_streams",
+        "-show_format",
+        str(path),
+    )
+    probe = json.loads(output)
+    streams = probe.get("streams", [])
+    video = next(s for s in streams if s.get("codec_type") == "video")
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    params = StreamParams(
+        video_codec=video["codec_name"],
+        video_profile=video.get("profile"),
+        width=int(video["width"]),
+        height=int(video["height"]),
+        pix_fmt=video.get("pix_fmt", "yuv420p"),
+        frame_rate=video.get("r_frame_rate", "24/1"),
+        time_base=video.get("time_base", "1/12800"),
+        audio_codec=audio["codec_name"] if audio else None,
+        sample_rate=int(audio["sample_rate"]) if audio else None,
+        channels=int(audio["channels"]) if audio else None,
+    )
+    duration = float(probe.get("format", {}).get("duration", 0.0))
+    return SegmentInfo(path=path, params=params, duration=duration)
+
+
+def load_manifest(work_dir: Path) -> Dict[str, Any]:
+    """Loads the segment manifest of a work directory."""
+    try:
+        manifest = json.loads((work_dir / MANIFEST_FILE_NAME).read_text())
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        manifest = {"version": MANIFEST_VERSION, "segments": {}, "outputs": {}}
+    return manifest
+
+
+def save_manifest(work_dir: Path, manifest: Dict[str, Any]):
+    """Atomically saves the segment manifest of a work directory."""
+    path = work_dir / MANIFEST_FILE_NAME
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    tmp_path.replace(path)
+
+
+def _file_content_hash(path: Path) -> str:
+    md5_hash = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            md5_hash.update(chunk)
+    return f"md5:{md5_hash.hexdigest()}"
+
+
+async def _content_hash(source: str) -> str:
+    if source.startswith("gs://"):
+        # Imported here, it needs GCP credentials.
+        from utils.storage_utils import get_gcs_content_hash
+        return await get_gcs_content_hash(source)
+    return await asyncio.to_thread(_file_content_hash, Path(source))
+
+
+def _hash_file_name(*keys: str) -> str:
+    """File-system-safe name for a combination of hashes."""
+    return hashlib.sha1("|".join(keys).encode()).hexdigest()[:20]
+
+
+def _params_key(params: StreamParams) -> str:
+    return _hash_file_name(json.dumps(asdict(params), sort_keys=True))
+
+
+def _stored_path(path: Path, work_dir: Path) -> str:
+    """Path relative to the work directory if it's inside of it."""
+    try:
+        return str(path.resolve().relative_to(work_dir.resolve()))
+    except ValueError:
+        return str(path.resolve())
+
+
+async def prepare_segments(
+    sources: List[str],
+    work_dir: Path,
+    manifest: Dict[str, Any],
+) -> Tuple[List[str], List[SegmentInfo], Dict[str, int]]:
+    """Resolves segments to local files, in order.
+
+    Segments whose content hash is already recorded in the manifest
+    are neither downloaded nor probed again. New GCS segments are
+    downloaded in parallel. Local file paths are used as they are.
+
+    Returns:
+        Tuple[List[str], List[SegmentInfo], Dict[str, int]]:
+            content hashes, segment infos and download statistics.
+    """
+    segments_dir = work_dir / "segments"
+    segments_dir.mkdir(parents=True, exist_ok=True)
+    known = manifest["segments"]
+    semaphore = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+    stats = {"downloaded_segments": 0, "reused_segments": 0}
+
+    async def _hash(source: str) -> str:
+        async with semaphore:
+            return await _content_hash(source)
+
+    async def _prepare(source: str, content_hash: str) -> SegmentInfo:
+        entry = known.get(content_hash)
+        if entry and (work_dir / entry["path"]).exists():
+            stats["reused_segments"] += 1
+            return SegmentInfo(
+                path=work_dir / entry["path"],
+                params=StreamParams(**entry["params"]),
+                duration=entry["duration"],
+            )
+        if source.startswith("gs://"):
+            from utils.storage_utils import download_gcs_to_file
+            suffix = Path(source).suffix or ".mp4"
+            path = segments_dir / f"{_hash_file_name(content_hash)}{suffix}"
+            async with semaphore:
+                with open(path, "wb") as f:
+                    await download_gcs_to_file(source, f)
+            stats["downloaded_segments"] += 1
+            logger.info(f"Downloaded {source} to {path}")
+        else:
+            path = Path(source)
+        segment = await probe_segment(path)
+        known[content_hash] = {
+            "source": source,
+            "path": _stored_path(path, work_dir),
+            "duration": segment.duration,
+            "params": asdict(segment.params),
+            "normalized": {},
+        }
+        return segment
+
+    hashes = list(await asyncio.gather(*[_hash(s) for s in sources]))
+    # The same segment may appear several times, prepare it once.
+    unique = dict(zip(hashes, sources))
+    prepared = dict(
+        zip(
+            unique.keys(),
+            await asyncio.gather(
+                *[_prepare(source, h) for h, source in unique.items()]
+            )
+        )
+    )
+    return hashes, [prepared[h] for h in hashes], stats
+
+
+async def normalize_segment(
+    segment: SegmentInfo,
+    target: StreamParams,
+    output_path: Path
+) -> Path:
+    """Re-encodes a segment to match the target stream parameters."""
+    scale = (
+        f"scale={target.width}:{target.height}:"
+        "force_original_aspect_ratio=decrease,"
+        f"pad={target.width}:{target.height}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+    )
+    args = [FFMPEG, "-y", "-v", "error", "-i", str(segment.path)]
+    add_silence = target.audio_codec and not segment.params.audio_codec
+    if add_silence:
+        args += [
+            "-f", "lavfi",
+            "-i", f"anullsrc=sample_rate={target.sample_rate}:"
+                  f"channel_layout={'mono' if target.channels == 1 else 'stereo'}",
+        ]
+    args += [
+        "-map", "0:v:0",
+        "-c:v", _VIDEO_ENCODERS.get(target.video_codec, "libx264"),
+        "-pix_fmt", target.pix_fmt,
+        "-vf", scale,
+        "-r", target.frame_rate,
+        "-video_track_timescale", target.time_base.split("/")[-1],
+    ]
+    if target.video_codec == "h264" and target.video_profile in _H264_PROFILES:
+        args += ["-profile:v", _H264_PROFILES[target.video_profile]]
+    if target.audio_codec:
+        args += [
+            "-map", "1:a:0" if add_silence else "0:a:0",
+            "-c:a", _AUDIO_ENCODERS.get(target.audio_codec, "aac"),
+            "-ar", str(target.sample_rate),
+            "-ac", str(target.channels),
+        ]
+        if add_silence:
+            args += ["-shortest"]
+    else:
+        args += ["-an"]
+    args.append(str(output_path))
+    await _run(*args)
+    return output_path
+
+
+async def concat_segments(paths: List[Path], output_path: Path) -> Path:
+    """Concatenates segments with identical stream parameters
+    without re-encoding."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    list_path = output_path.with_name(f"{output_path.stem}_filelist.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in paths:
+            escaped = str(path.resolve()).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    try:
+        await _run(
+            FFMPEG, "-y", "-v", "error",
+            "-f", "concat", "-safe", "0",
+            "-i", str(list_path),
+            "-map", "0",
+            "-c", "copy",
+            "-movflags", "+faststart",
+            str(output_path),
+        )
+    finally:
+        list_path.unlink(missing_ok=True)
+    return output_path
+
+
+async def merge_segments(
+    sources: List[str],
+    output_path: Path,
+    work_dir: Path
+) -> Dict[str, Any]:
+    """Merges segments in the given order, incrementally.
+
+    The manifest in `work_dir` records every segment's source, content hash,
+    duration and stream parameters, as well as re-encoded versions
+    of mismatched segments. Only new or changed segments are downloaded
+    and re-encoded. If no segment changed, the existing output is kept.
+
+    Returns:
+        Dict[str, Any]: merge statistics.
+    """
+    start = time.time()
+    work_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(work_dir)
+    hashes, segments, result = await prepare_segments(
+        sources,
+        work_dir,
+        manifest
+    )
+    prepare_seconds = time.time() - start
+
+    target = Counter(s.params for s in segments).most_common(1)[0][0]
+    target_key = _params_key(target)
+    known = manifest["segments"]
+    parts: Dict[str, Path] = {}
+    to_normalize = {}
+    reused_normalized = 0
+    for content_hash, segment in zip(hashes, segments):
+        if segment.params == target or content_hash in parts:
+            parts.setdefault(content_hash, segment.path)
+            continue
+        normalized = known[content_hash]["normalized"].get(target_key)
+        if normalized and (work_dir / normalized).exists():
+            parts[content_hash] = work_dir / normalized
+            reused_normalized += 1
+            continue
+        normalized_path = work_dir / "segments" / (
+            f"{_hash_file_name(content_hash, target_key)}_normalized.mp4"
+        )
+        parts[content_hash] = normalized_path
+        to_normalize[content_hash] = (segment, normalized_path)
+    await asyncio.gather(
+        *[
+            normalize_segment(segment, target, path)
+            for segment, path in to_normalize.values()
+        ]
+    )
+    for content_hash, (_, path) in to_normalize.items():
+        known[content_hash]["normalized"][target_key] = _stored_path(
+            path,
+            work_dir
+        )
+
+    # Final stream-copy remux, skipped if nothing has changed.
+    signature = _hash_file_name(target_key, *hashes)
+    output_key = _stored_path(output_path, work_dir)
+    previous = manifest["outputs"].get(output_key, {})
+    output_reused = (
+        previous.get("signature") == signature and output_path.exists()
+    )
+    if not output_reused:
+        await concat_segments([parts[h] for h in hashes], output_path)
+    manifest["outputs"][output_key] = {
+        "signature": signature,
+        "segments": hashes,
+        "target_params": asdict(target),
+    }
+    _prune_manifest(manifest, work_dir)
+    save_manifest(work_dir, manifest)
+
+    result.update({
+        "segments": len(segments),
+        "re_encoded_segments": len(to_normalize),
+        "reused_re_encoded_segments": reused_normalized,
+        "output_reused": output_reused,
+        "duration_seconds": round(sum(s.duration for s in segments), 3),
+        "prepare_seconds": round(prepare_seconds, 3),
+        "total_seconds": round(time.time() - start, 3),
+        "output": str(output_path),
+    })
+    logger.info(f"Merged video: {json.dumps(result)}")
+    return result
+
+
+def _prune_manifest(manifest: Dict[str, Any], work_dir: Path):
+    """Removes segments that no output refers to anymore,
+    together with their downloaded and re-encoded files."""
+    referenced = set()
+    for output in manifest["outputs"].values():
+        referenced.update(output["segments"])
+    segments_dir = (work_dir / "segments").resolve()
+    for content_hash in list(manifest["segments"]):
+        if content_hash in referenced:
+            continue
+        entry = manifest["segments"].pop(content_hash)
+        for stored in [entry["path"], *entry["normalized"].values()]:
+            path = (work_dir / stored).resolve()
+            if path.parent == segments_dir:
+                path.unlink(missing_ok=True)
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def evict_work_dirs(keep: Path):
+    """Deletes session work directories under MERGE_WORK_ROOT that have
+    been idle for longer than MERGE_WORK_DIR_TTL_SECONDS, then the least
+    recently used ones while all of them exceed MERGE_WORK_ROOT_MAX_BYTES.
+    `keep` and directories being merged are never deleted."""
+    if not MERGE_WORK_ROOT.is_dir():
+        return
+    candidates = []
+    total = 0
+    for path in MERGE_WORK_ROOT.iterdir():
+        if not path.is_dir():
+            continue
+        size = _dir_size(path)
+        total += size
+        lock = _work_dir_locks.get(path)
+        if path != keep and not (lock and lock.locked()):
+            candidates.append((path.stat().st_mtime, path, size))
+    now = time.time()
+    for mtime, path, size in sorted(candidates):
+        if (
+            now - mtime <= MERGE_WORK_DIR_TTL_SECONDS
+            and total <= MERGE_WORK_ROOT_MAX_BYTES
+        ):
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        _work_dir_locks.pop(path, None)
+        total -= size
+        logger.info(f"Evicted merge work directory {path}")
+
+
+async def merge_video_segments(
+    segment_uris: List[str],
+    tool_context: "ToolContext",
+) -> Dict[str, Any]:
+    """Merges video segments into one final video.
+
+    Args:
+        segment_uris (List[str]): GCS URIs ("gs://...") of all video segments
+            in the order of the respective script chunks.
+
+    Returns:
+        Dict[str, Any]: `uri` of the final video or `error`.
+    """
+    from utils.storage_utils import upload_data_to_gcs
+
+    if not segment_uris:
+        return {"error": "No video segments to merge."}
+    # Work directory persists between merges of the same session,
+    # so that unchanged segments are not downloaded again.
+    session_id = tool_context._invocation_context.session.id
+    work_dir = MERGE_WORK_ROOT / session_id
+    output_path = work_dir / "final_video.mp4"
+    lock = _work_dir_locks.setdefault(work_dir, asyncio.Lock())
+    async with lock:
+        await asyncio.to_thread(evict_work_dirs, work_dir)
+        try:
+            result = await merge_segments(segment_uris, output_path, work_dir)
+            with open(output_path, "rb") as f:
+                result["uri"] = await upload_data_to_gcs(
+                    tool_context.agent_name,
+                    f,
+                    "video/mp4"
+                )
+        except Exception as e:
+            logger.exception("Video merge failed.")
+            return {"error": f"Video merge failed: {e}"}
+        finally:
+            # Only the segments are reused, the output is uploaded.
+            output_path.unlink(missing_ok=True)
+    result.pop("output", None)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge video segments into a single video."
+    )
+    parser.add_argument(
+        "segments",
+        nargs="+",
+        help="Segment GCS URIs or local paths, in order."
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="output/final_video.mp4",
+        help="Output video path."
+    )
+    parser.add_argument(
+        "--work-dir",
+        "-w",
+        default=None,
+        help="Directory for downloaded segments and the merge manifest. "
+             "Defaults to the output directory."
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if not ffmpeg_available():
+        parser.error("ffmpeg and ffprobe must be installed.")
+    output_path = Path(args.output)
+    work_dir = Path(args.work_dir) if args.work_dir else output_path.parent
+    result = asyncio.run(merge_segments(args.segments, output_path, work_dir))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
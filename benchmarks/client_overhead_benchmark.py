@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per-call client overhead: a fresh client per call vs. pooled clients.
+
+Each iteration makes one cheap API call (a model metadata lookup for
+GenAI, a bucket metadata lookup for Storage), so the measured time is
+dominated by client construction, authentication and connection setup.
+
+Requires the same environment as the MCP server (.env with
+GOOGLE_CLOUD_PROJECT and AI_ASSETS_BUCKET).
+
+Usage:
+    python benchmarks/client_overhead_benchmark.py --iterations 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp"))
+
+from google.adk.models.google_llm import Gemini  # noqa: E402
+from google.cloud.storage import Client as StorageClient  # noqa: E402
+
+from clients import (  # noqa: E402
+    PREWARM_MODEL,
+    get_genai_client,
+    get_storage_client,
+    prewarm_clients,
+)
+from storage_utils import ai_bucket_name  # noqa: E402
+
+
+async def _genai_fresh():
+    await Gemini().api_client.aio.models.get(model=PREWARM_MODEL)
+
+
+async def _genai_pooled():
+    await get_genai_client().aio.models.get(model=PREWARM_MODEL)
+
+
+async def _storage_fresh():
+    client = StorageClient(project=os.environ.get("GOOGLE_CLOUD_PROJECT"))
+    await asyncio.to_thread(client.get_bucket, ai_bucket_name)
+
+
+async def _storage_pooled():
+    await asyncio.to_thread(get_storage_client().get_bucket, ai_bucket_name)
+
+
+async def _measure(name: str, call, iterations: int) -> dict:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "case": name,
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p50_ms": round(statistics.median(timings), 2),
+        "max_ms": round(max(timings), 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    await prewarm_clients(ai_bucket_name)
+    for name, call in [
+        ("genai_fresh_client", _genai_fresh),
+        ("genai_pooled_client", _genai_pooled),
+        ("storage_fresh_client", _storage_fresh),
+        ("storage_pooled_client", _storage_pooled),
+    ]:
+        print(json.dumps(await _measure(name, call, args.iterations)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per-view compositing time of the Pillow and NumPy backends.
+
+Renders every view of a scene spec with both backends (without saving),
+reports the mean and p50 time per view, and checks that the NumPy output
+matches the Pillow output within compositor_numpy.MAX_PIXEL_DIFFERENCE.
+Exits with a non-zero status if it doesn't.
+
+Usage (from the repository root):
+    python benchmarks/compositing_backend_benchmark.py scenes/views_v2.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from compositor import (  # noqa: E402
+    build_plan,
+    get_renderer,
+    load_spec,
+    prepare_assets,
+)
+from compositor_numpy import MAX_PIXEL_DIFFERENCE, max_difference  # noqa: E402
+
+
+def _measure(render, views, iterations: int) -> dict:
+    for view in views: # warm-up, converts assets on first use
+        render(view)
+    timings = []
+    for _ in range(iterations):
+        for view in views:
+            start = time.perf_counter()
+            render(view)
+            timings.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "views": len(timings),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p50_ms": round(statistics.median(timings), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("spec", nargs="?", default="scenes/views_v2.json")
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    plan = build_plan(load_spec(args.spec), Path("."))
+    assets = prepare_assets(plan)
+    renderers = {
+        backend: get_renderer(assets, backend)
+        for backend in ["pil", "numpy"]
+    }
+    for backend, render in renderers.items():
+        result = _measure(render, plan.views, args.iterations)
+        print(json.dumps({"backend": backend, **result}))
+    difference = max(
+        max_difference(renderers["pil"](view), renderers["numpy"](view))
+        for view in plan.views
+    )
+    print(json.dumps({
+        "max_pixel_difference": difference,
+        "tolerance": MAX_PIXEL_DIFFERENCE,
+    }))
+    if difference > MAX_PIXEL_DIFFERENCE:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compositing benchmark suite on synthetic assets.
+
+Generates character sprites (RGBA with transparent margins), Desmos-sized
+and full-frame backgrounds, and a logo at the sizes of the real assets,
+plus a scene spec with --views views. For every backend, in a fresh
+process each:
+- per-view render time (mean, p50, p95) from prepared assets,
+- batch throughput of a full rebuild (plan, prepare, render and save),
+- peak RSS of the process.
+
+Results are written as JSON (--output). With --baseline, the mean
+per-view time and the batch time of every backend are compared to a
+previous result file, and the benchmark exits with a non-zero status
+if any got slower by more than --threshold.
+
+Usage (from the repository root):
+    python benchmarks/compositing_suite_benchmark.py --output bench.json
+    python benchmarks/compositing_suite_benchmark.py --baseline bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+from pathlib import Path
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np  # noqa: E402
+import PIL  # noqa: E402
+from PIL import Image, ImageDraw  # noqa: E402
+
+from compositor import (  # noqa: E402
+    build_plan,
+    get_renderer,
+    prepare_assets,
+    render_plan,
+)
+
+SPRITE_SIZE = (1024, 1536)
+DESMOS_SIZE = (1200, 828)
+SCREEN_SIZE = (1920, 1080)
+LOGO_SIZE = (512, 512)
+SPRITES = 4
+BACKGROUNDS = 6
+
+
+def _noise(size, rng: np.random.Generator) -> Image.Image:
+    """Low-amplitude noise, so that PNGs compress like real images."""
+    return Image.fromarray(
+        rng.integers(0, 24, (size[1], size[0], 3), dtype=np.uint8),
+        "RGB"
+    )
+
+
+def make_assets(directory: Path, seed: int = 0):
+    """Writes synthetic sprites, backgrounds and a logo."""
+    rng = np.random.default_rng(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(SPRITES):
+        sprite = Image.new("RGBA", SPRITE_SIZE, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(sprite)
+        width, height = SPRITE_SIZE
+        color = tuple(int(c) for c in rng.integers(40, 200, 3))
+        draw.ellipse(
+            (width * 0.2, height * 0.3, width * 0.8, height * 0.95),
+            fill=color + (255,)
+        )
+        draw.ellipse(
+            (width * 0.3, height * 0.05, width * 0.7, height * 0.4),
+            fill=color + (255,)
+        )
+        # Soft shadow: translucent pixels are the expensive ones.
+        draw.ellipse(
+            (width * 0.15, height * 0.9, width * 0.85, height),
+            fill=(0, 0, 0, 60)
+        )
+        sprite.save(directory / f"sprite_{i}.png")
+    for i in range(BACKGROUNDS):
+        size = DESMOS_SIZE if i % 2 else SCREEN_SIZE
+        background = Image.eval(_noise(size, rng), lambda v: 255 - v)
+        draw = ImageDraw.Draw(background)
+        for x in range(0, size[0], 40):
+            draw.line((x, 0, x, size[1]), fill=(200, 200, 200))
+        for y in range(0, size[1], 40):
+            draw.line((0, y, size[0], y), fill=(200, 200, 200))
+        draw.line((0, size[1] // 2, size[0], 0), fill=(199, 68, 64), width=4)
+        background.save(directory / f"background_{i}.png")
+    logo = Image.new("RGBA", LOGO_SIZE, (0, 0, 0, 0))
+    ImageDraw.Draw(logo).ellipse((0, 0) + LOGO_SIZE, fill=(66, 133, 244, 255))
+    logo.save(directory / "logo.png")
+
+
+def make_spec(directory: Path, views: int) -> dict:
+    """A scene spec in the style of scenes/views_v2.json."""
+    return {
+        "assets_dir": str(directory / "assets"),
+        "output_dir": str(directory / "out"),
+        "canvas": {"width": 1920, "height": 1080, "color": [255, 255, 255]},
+        "output": {"format": "PNG", "compress_level": 1},
+        "logo": {
+            "image": "logo.png",
+            "height": 80,
+            "anchor": "top-left",
+            "offset": [20, 20],
+            "text": [{"text": "Benchmark", "size": 26, "y": 18}],
+        },
+        "defaults": {
+            "background": {"width": 0.65, "height": 1.0, "anchor": "top-right"},
+            "character": {"height": 0.7, "anchor": "bottom-left",
+                          "offset": [50, 20]},
+            "logo": True,
+        },
+        "views": [
+            {
+                "output": f"view{i + 1}.png",
+                "background": f"background_{i % BACKGROUNDS}.png",
+                "character": {
+                    "image": f"sprite_{i % SPRITES}.png",
+                    "flip": bool(i % 3 == 0),
+                },
+            }
+            for i in range(views)
+        ],
+    }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_case(spec: dict, backend: str, iterations: int) -> dict:
+    """Benchmarks one backend. Runs in a fresh process,
+    so that peak RSS is per backend."""
+    start = time.perf_counter()
+    results = render_plan(
+        build_plan(spec, Path(".")),
+        backend=backend,
+        force=True
+    )
+    batch_seconds = time.perf_counter() - start
+
+    plan = build_plan(spec, Path("."))
+    render = get_renderer(prepare_assets(plan), backend)
+    for view in plan.views:  # warm-up, converts assets on first use
+        render(view)
+    timings = []
+    for _ in range(iterations):
+        for view in plan.views:
+            view_start = time.perf_counter()
+            render(view)
+            timings.append((time.perf_counter() - view_start) * 1000.0)
+    timings.sort()
+    return {
+        "backend": backend,
+        "views": len(plan.views),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 2),
+        "batch_seconds": round(batch_seconds, 3),
+        "batch_views_per_second": round(len(results) / batch_seconds, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def find_regressions(
+    results: list,
+    baseline: dict,
+    threshold: float
+) -> list:
+    """Compares per-view and batch times to a baseline result file.
+
+    Returns:
+        list: one message per metric that is more than `threshold`
+            (a fraction) slower than in the baseline.
+    """
+    previous = {r["backend"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get(result["backend"])
+        if not before:
+            continue
+        for metric in ("mean_ms", "batch_seconds"):
+            if result[metric] > before[metric] * (1 + threshold):
+                regressions.append(
+                    f"{result['backend']} {metric}: {before[metric]} -> "
+                    f"{result[metric]} (+"
+                    f"{(result[metric] / before[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--views", type=int, default=24)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=["pil", "numpy"],
+        default=["pil", "numpy"]
+    )
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    parser.add_argument("--baseline", help="Previous results to compare to.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown relative to the baseline (0.2 = 20%%)."
+    )
+    args = parser.parse_args()
+    # Read before running, --output may overwrite the baseline.
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    with tempfile.TemporaryDirectory() as tmp:
+        make_assets(Path(tmp) / "assets")
+        spec = make_spec(Path(tmp), args.views)
+        context = multiprocessing.get_context("spawn")
+        results = []
+        for backend in args.backends:
+            with context.Pool(1) as pool:
+                result = pool.apply(
+                    run_case,
+                    (spec, backend, args.iterations)
+                )
+            print(json.dumps(result))
+            results.append(result)
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": multiprocessing.cpu_count(),
+        "views": args.views,
+        "iterations": args.iterations,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if baseline:
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Event loop responsiveness while large GCS transfers are running.
+
+Simulates lightweight tool calls (a probe coroutine scheduled every few
+milliseconds) while several large uploads and downloads run, first with
+blocking calls made directly on the event loop (the old behavior),
+then with the async storage API. With the async API the probe latency
+stays flat regardless of the transfer size.
+
+Requires the same environment as the MCP server (.env with
+GOOGLE_CLOUD_PROJECT and AI_ASSETS_BUCKET).
+
+Usage:
+    python benchmarks/storage_io_benchmark.py --size-mb 64 --transfers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp"))
+
+from google.cloud.storage import Blob  # noqa: E402
+
+from storage_utils import (  # noqa: E402
+    ai_bucket,
+    download_data_from_gcs,
+    download_data_from_gcs_sync,
+    storage_client,
+    upload_data_to_gcs,
+    upload_data_to_gcs_sync,
+)
+
+PROBE_INTERVAL = 0.005 # 5 ms between simulated tool calls
+AGENT_ID = "storage-io-benchmark"
+
+
+async def _probe(latencies: list, stop: asyncio.Event):
+    """Measures how late the event loop runs a short task."""
+    while not stop.is_set():
+        expected = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        latencies.append((time.perf_counter() - expected) * 1000.0)
+
+
+async def _blocking_transfers(payloads: list) -> list:
+    uris = [
+        upload_data_to_gcs_sync(AGENT_ID, data, "video/mp4")
+        for data in payloads
+    ]
+    for uri in uris:
+        download_data_from_gcs_sync(uri)
+    return uris
+
+
+async def _async_transfers(payloads: list) -> list:
+    uris = await asyncio.gather(
+        *[upload_data_to_gcs(AGENT_ID, data, "video/mp4") for data in payloads]
+    )
+    await asyncio.gather(*[download_data_from_gcs(uri) for uri in uris])
+    return uris
+
+
+async def _run_mode(name: str, transfers, payloads: list) -> dict:
+    latencies = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(latencies, stop))
+    await asyncio.sleep(PROBE_INTERVAL * 10) # baseline samples
+    start = time.perf_counter()
+    uris = await transfers(payloads)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    for uri in uris:
+        Blob.from_string(uri, client=storage_client).delete()
+    latencies.sort()
+    return {
+        "mode": name,
+        "transfer_seconds": round(elapsed, 3),
+        "probe_samples": len(latencies),
+        "probe_latency_p50_ms": round(statistics.median(latencies), 2),
+        "probe_latency_p99_ms": round(
+            latencies[int(0.99 * (len(latencies) - 1))], 2
+        ),
+        "probe_latency_max_ms": round(latencies[-1], 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--transfers", type=int, default=4)
+    args = parser.parse_args()
+    print(f"Bucket: {ai_bucket.name}")
+    results = []
+    for name, transfers in [
+        ("blocking", _blocking_transfers),
+        ("async", _async_transfers),
+    ]:
+        # New random payloads for every mode, so uploads are never skipped.
+        payloads = [
+            os.urandom(args.size_mb * 1024 * 1024)
+            for _ in range(args.transfers)
+        ]
+        results.append(await _run_mode(name, transfers, payloads))
+        print(json.dumps(results[-1], indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,1193 @@
+#!/usr/bin/env python3
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Renders view images from a declarative scene spec.
+
+A scene spec (JSON or YAML) describes the canvas, the output format and
+every view: a background, a character sprite and an optional logo.
+The spec is first compiled into a render plan. Every unique
+(asset, size, flip) combination in the plan is decoded and resampled
+exactly once, and all views are composited from these prepared assets.
+
+Layer properties:
+    image: Path relative to the spec's `assets_dir`.
+    width, height: Target size. Both given: stretch to that size.
+        One given: scale proportionally.
+    max_width, max_height: Upper bounds after proportional scaling.
+    anchor: Canvas edge or corner the layer is attached to, e.g. "left",
+        "bottom-left", "top-right" or "center".
+    offset: [x, y] distance from the anchor edges.
+    flip: Mirror the image horizontally.
+
+Sizes and offsets are pixels if given as integers, and fractions
+of the canvas width or height if given as floats (e.g. 0.65).
+
+The `logo` and `watermark` entries of a spec are static layers: an optional
+image with text lines, identical in every view that enables them. Each
+is rendered once per canvas size, cached in memory and on disk
+(COMPOSITOR_CACHE_DIR), and composited on top of the view like any
+other prepared asset.
+
+A spec can target several aspect ratios with `formats`, e.g.
+    "formats": {
+        "16:9": {"output_dir": "assets"},
+        "9:16": {"defaults": {"character": {"anchor": "bottom"}}}
+    }
+Each format may override `canvas` (derived from the aspect ratio by
+default, keeping the long side), `output_dir` (default: `output_dir`
+plus e.g. "9x16"), `output`, the layer `defaults` and the static
+layers, and a view may override its layers per format in its own
+`formats` entry. All formats are planned together, so sources shared
+by both aspect ratios are decoded once, and the views of all formats
+are paired by their index in `views`.
+
+Usage:
+    python compositor.py scenes/views_v2.json [--workers 0] [--backend numpy]
+    python compositor.py scenes/views_v2.json --preview preview.png
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+import hashlib
+import io
+import json
+from multiprocessing import shared_memory
+import os
+from pathlib import Path
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import PIL
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+FONT_PATHS = [
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/System/Library/Fonts/SFNSText.ttf",
+    "/Library/Fonts/Arial.ttf",
+]
+DEFAULT_CANVAS = {"width": 1920, "height": 1080, "color": [255, 255, 255]}
+DEFAULT_OUTPUT = {"format": "PNG"}
+LAYER_NAMES = ["background", "character"]
+# Layers that are identical in every view, composited on top.
+STATIC_LAYER_NAMES = ["logo", "watermark"]
+STATIC_LAYER_PREFIX = "layer:"
+STATIC_LAYER_VERSION = 1
+# Bump to rebuild all views after changing how views are rendered.
+RENDER_VERSION = 1
+# Per output directory, records what every view was rendered from.
+MANIFEST_FILE_NAME = ".compositor-manifest.json"
+# Rendered static layers are cached on disk here. Empty to disable.
+STATIC_LAYER_CACHE_DIR = os.environ.get(
+    "COMPOSITOR_CACHE_DIR",
+    ".cache/compositor"
+)
+
+Size = Union[int, float]
+
+# Static layers by key: (image, position).
+_static_layers: Dict[str, Tuple[Image.Image, Tuple[int, int]]] = {}
+
+
+@dataclass(frozen=True)
+class AssetKey:
+    """A source image at a specific size and orientation."""
+    path: str
+    size: Tuple[int, int]
+    flip: bool = False
+
+
+@dataclass
+class Placement:
+    asset: AssetKey
+    position: Tuple[int, int]
+
+
+@dataclass
+class ViewPlan:
+    """Everything needed to render and save one view."""
+    output_path: str
+    canvas_size: Tuple[int, int]
+    canvas_color: Tuple[int, ...]
+    placements: List[Placement] = field(default_factory=list)
+    output: Dict[str, Any] = field(default_factory=dict)
+    # Position in the spec's views, shared by all formats of a view.
+    index: int = 0
+    aspect_ratio: Optional[str] = None
+
+
+@dataclass
+class RenderPlan:
+    views: List[ViewPlan]
+
+    @property
+    def assets(self) -> List[AssetKey]:
+        """Unique prepared assets, in order of first use."""
+        keys = {}
+        for view in self.views:
+            for placement in view.placements:
+                keys.setdefault(placement.asset, None)
+        return list(keys)
+
+
+@lru_cache(maxsize=None)
+def _font_path() -> Optional[str]:
+    """Returns the first usable font of FONT_PATHS, resolved once."""
+    for font_path in FONT_PATHS:
+        if os.path.exists(font_path):
+            try:
+                ImageFont.truetype(font_path, 12)
+                return font_path
+            except OSError:
+                pass
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_font(size: int) -> ImageFont.ImageFont:
+    """Returns the resolved font at the given size."""
+    font_path = _font_path()
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=None)
+def _source_size(path: str) -> Tuple[int, int]:
+    """Reads image dimensions from the file header, without decoding."""
+    with Image.open(path) as image:
+        return image.size
+
+
+def load_spec(path: str) -> Dict[str, Any]:
+    """Loads a JSON or YAML scene spec."""
+    with open(path, encoding="utf-8") as f:
+        if Path(path).suffix.lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError(
+                    "PyYAML is required for YAML scene specs: "
+                    "pip install pyyaml"
+                ) from e
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def _resolve(value: Optional[Size], total: int) -> Optional[int]:
+    """Pixels for integers, fractions of `total` for floats."""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        return int(total * value)
+    return int(value)
+
+
+def _resolve_offset(
+    offset: List[Size],
+    canvas_size: Tuple[int, int]
+) -> Tuple[int, int]:
+    return (
+        _resolve(offset[0], canvas_size[0]),
+        _resolve(offset[1], canvas_size[1])
+    )
+
+
+def scaled_size(
+    source_size: Tuple[int, int],
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+) -> Tuple[int, int]:
+    """Computes the target size of a layer.
+
+    Args:
+        source_size (Tuple[int, int]): Source image size.
+        width (Optional[int], optional): Target width. Defaults to None.
+        height (Optional[int], optional): Target height. Defaults to None.
+        max_width (Optional[int], optional): Maximum width. Defaults to None.
+        max_height (Optional[int], optional): Maximum height.
+            Defaults to None.
+
+    Returns:
+        Tuple[int, int]: target width and height.
+    """
+    source_width, source_height = source_size
+    if width is not None and height is not None:
+        return (width, height)
+    if width is not None:
+        new_width = width
+        new_height = int(source_height * (width / source_width))
+    elif height is not None:
+        new_width = int(height * (source_width / source_height))
+        new_height = height
+    else:
+        new_width, new_height = source_width, source_height
+    if max_height is not None and new_height > max_height:
+        new_width = int(source_width * (max_height / source_height))
+        new_height = max_height
+    if max_width is not None and new_width > max_width:
+        new_height = int(source_height * (max_width / source_width))
+        new_width = max_width
+    return (new_width, new_height)
+
+
+def anchor_position(
+    canvas_size: Tuple[int, int],
+    size: Tuple[int, int],
+    anchor: str = "center",
+    offset: Tuple[int, int] = (0, 0),
+) -> Tuple[int, int]:
+    """Computes the top-left position of a layer attached to
+    a canvas edge or corner. Offsets move the layer away from that edge."""
+    canvas_width, canvas_height = canvas_size
+    width, height = size
+    offset_x, offset_y = offset
+    parts = set(anchor.split("-"))
+    if "left" in parts:
+        x = offset_x
+    elif "right" in parts:
+        x = canvas_width - width - offset_x
+    else:
+        x = (canvas_width - width) // 2 + offset_x
+    if "top" in parts:
+        y = offset_y
+    elif "bottom" in parts:
+        y = canvas_height - height - offset_y
+    else:
+        y = (canvas_height - height) // 2 + offset_y
+    return (x, y)
+
+
+def _layer_spec(
+    value: Union[str, Dict[str, Any], None],
+    defaults: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Merges a view's layer entry over the spec defaults.
+    A string is a shorthand for {"image": value}."""
+    if value is None or value is False:
+        return None
+    if isinstance(value, str):
+        value = {"image": value}
+    return {**defaults, **value}
+
+
+def plan_layer(
+    layer: Dict[str, Any],
+    canvas_size: Tuple[int, int],
+    assets_dir: Path
+) -> Placement:
+    """Computes the prepared asset and position of a layer."""
+    canvas_width, canvas_height = canvas_size
+    path = str(assets_dir / layer["image"])
+    size = scaled_size(
+        _source_size(path),
+        width=_resolve(layer.get("width"), canvas_width),
+        height=_resolve(layer.get("height"), canvas_height),
+        max_width=_resolve(layer.get("max_width"), canvas_width),
+        max_height=_resolve(layer.get("max_height"), canvas_height),
+    )
+    position = anchor_position(
+        canvas_size,
+        size,
+        layer.get("anchor", "center"),
+        _resolve_offset(layer.get("offset", [0, 0]), canvas_size),
+    )
+    return Placement(
+        AssetKey(path, size, bool(layer.get("flip", False))),
+        position
+    )
+
+
+@lru_cache(maxsize=None)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """Content hash of a file, cached per modification time and size."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _path_digest(path: str) -> str:
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_mtime_ns, stat.st_size)
+
+
+def _static_layer_key(
+    item: Dict[str, Any],
+    canvas_size: Tuple[int, int],
+    assets_dir: Path
+) -> str:
+    """Digest of everything a static layer depends on: the layer spec,
+    the canvas size, the image file contents and the resolved font."""
+    image_digest = None
+    if "image" in item:
+        image_digest = _path_digest(str(assets_dir / item["image"]))
+    description = json.dumps(
+        [item, canvas_size, image_digest, _font_path(), STATIC_LAYER_VERSION],
+        sort_keys=True
+    )
+    return hashlib.sha256(description.encode()).hexdigest()[:32]
+
+
+def _draw_static_item(
+    overlay: Image.Image,
+    item: Dict[str, Any],
+    assets_dir: Path
+):
+    """Draws a logo or watermark: an optional image with text lines
+    next to it."""
+    canvas_size = overlay.size
+    opacity = float(item.get("opacity", 1.0))
+    lines = item.get("text", [])
+    if "image" not in item:
+        # Text only: anchor the bounding box of all lines.
+        draw = ImageDraw.Draw(overlay)
+        boxes = [
+            draw.textbbox(
+                (0, line.get("y", 0)),
+                line["text"],
+                font=get_font(line.get("size", 24))
+            )
+            for line in lines
+        ]
+        text_x, y = anchor_position(
+            canvas_size,
+            (max(b[2] for b in boxes), max(b[3] for b in boxes)),
+            item.get("anchor", "top-left"),
+            _resolve_offset(item.get("offset", [0, 0]), canvas_size),
+        )
+    else:
+        placement = plan_layer(
+            {"anchor": "top-left", **item},
+            canvas_size,
+            assets_dir
+        )
+        image = _resize(
+            _decode(placement.asset.path),
+            placement.asset.size
+        )
+        if placement.asset.flip:
+            image = ImageOps.mirror(image)
+        if opacity < 1.0:
+            image.putalpha(
+                image.getchannel("A").point(lambda a: int(a * opacity))
+            )
+        overlay.alpha_composite(image, placement.position)
+        x, y = placement.position
+        text_x = x + placement.asset.size[0] + item.get("text_gap", 15)
+    if lines:
+        text_layer = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(text_layer)
+        for line in lines:
+            draw.text(
+                (text_x, y + line.get("y", 0)),
+                line["text"],
+                fill=(
+                    *line.get("color", [33, 33, 33])[:3],
+                    int(255 * opacity)
+                ),
+                font=get_font(line.get("size", 24)),
+            )
+        overlay.alpha_composite(text_layer)
+
+
+def _render_static_layer(
+    item: Dict[str, Any],
+    canvas_size: Tuple[int, int],
+    assets_dir: Path
+) -> Tuple[Image.Image, Tuple[int, int]]:
+    """Renders a static item on a transparent canvas
+    and crops it to its content."""
+    overlay = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
+    _draw_static_item(overlay, item, assets_dir)
+    bbox = overlay.getbbox() or (0, 0, 1, 1)
+    return overlay.crop(bbox), (bbox[0], bbox[1])
+
+
+def plan_static_layer(
+    item: Dict[str, Any],
+    canvas_size: Tuple[int, int],
+    assets_dir: Path
+) -> Placement:
+    """Plans a static layer (logo with brand text, or watermark)
+    that is composited on top of views.
+
+    The layer is rendered once per item and canvas size,
+    and cached in memory and in STATIC_LAYER_CACHE_DIR.
+
+    Returns:
+        Placement: placement of the cached layer.
+    """
+    key = _static_layer_key(item, canvas_size, assets_dir)
+    if key not in _static_layers:
+        layer = None
+        cache_dir = Path(STATIC_LAYER_CACHE_DIR) if STATIC_LAYER_CACHE_DIR \
+            else None
+        if cache_dir and (cache_dir / f"{key}.json").exists():
+            position = json.loads(
+                (cache_dir / f"{key}.json").read_text()
+            )["position"]
+            layer = (_decode(str(cache_dir / f"{key}.png")), tuple(position))
+        if layer is None:
+            layer = _render_static_layer(item, canvas_size, assets_dir)
+            if cache_dir:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = cache_dir / f"{key}.png.tmp"
+                layer[0].save(tmp_path, "PNG")
+                tmp_path.replace(cache_dir / f"{key}.png")
+                # Written last, so its presence marks a complete entry.
+                (cache_dir / f"{key}.json").write_text(
+                    json.dumps({"position": list(layer[1])})
+                )
+        _static_layers[key] = layer
+    image, position = _static_layers[key]
+    return Placement(
+        AssetKey(f"{STATIC_LAYER_PREFIX}{key}", image.size),
+        position
+    )
+
+
+def aspect_canvas(
+    aspect_ratio: str,
+    canvas_size: Tuple[int, int]
+) -> Tuple[int, int]:
+    """Returns a canvas size with the given aspect ratio (e.g. "9:16")
+    and the same long side as `canvas_size`."""
+    width, height = (int(v) for v in aspect_ratio.split(":"))
+    long_side = max(canvas_size)
+    if width >= height:
+        return (long_side, round(long_side * height / width))
+    return (round(long_side * width / height), long_side)
+
+
+def _merge(base: Any, override: Any) -> Any:
+    """Merges dicts one level deep, other overrides replace the base."""
+    if isinstance(base, dict) and isinstance(override, dict):
+        return {**base, **override}
+    return override
+
+
+def _plan_format(
+    spec: Dict[str, Any],
+    base_dir: Path,
+    aspect_ratio: Optional[str] = None
+) -> List[ViewPlan]:
+    """Plans all views of a spec for one of its formats,
+    or without formats if `aspect_ratio` is None."""
+    overrides = spec["formats"][aspect_ratio] if aspect_ratio else {}
+    overrides = overrides or {}
+    canvas = {**DEFAULT_CANVAS, **spec.get("canvas", {})}
+    if aspect_ratio:
+        canvas["width"], canvas["height"] = aspect_canvas(
+            aspect_ratio,
+            (canvas["width"], canvas["height"])
+        )
+    canvas.update(overrides.get("canvas", {}))
+    canvas_size = (canvas["width"], canvas["height"])
+    assets_dir = base_dir / spec.get("assets_dir", "assets")
+    output_dir = base_dir / spec.get("output_dir", "assets")
+    if aspect_ratio:
+        output_dir = base_dir / overrides.get(
+            "output_dir",
+            str(Path(spec.get("output_dir", "assets"))
+                / aspect_ratio.replace(":", "x"))
+        )
+    output = {
+        **DEFAULT_OUTPUT,
+        **spec.get("output", {}),
+        **overrides.get("output", {})
+    }
+    defaults = dict(spec.get("defaults", {}))
+    for name, value in overrides.get("defaults", {}).items():
+        defaults[name] = _merge(defaults.get(name, {}), value)
+    static_layers = {
+        name: _merge(spec.get(name), overrides[name])
+        if name in overrides else spec.get(name)
+        for name in STATIC_LAYER_NAMES
+    }
+    views = []
+    for index, view in enumerate(spec["views"]):
+        view_overrides = (
+            view.get("formats", {}).get(aspect_ratio) or {}
+            if aspect_ratio else {}
+        )
+        plan = ViewPlan(
+            output_path=str(output_dir / view["output"]),
+            canvas_size=canvas_size,
+            canvas_color=tuple(canvas["color"]),
+            output={**output, **view.get("output_settings", {})},
+            index=index,
+            aspect_ratio=aspect_ratio,
+        )
+        for name in LAYER_NAMES:
+            layer = _layer_spec(view.get(name), defaults.get(name, {}))
+            if name in view_overrides:
+                layer = _layer_spec(
+                    view_overrides[name],
+                    layer or defaults.get(name, {})
+                )
+            if layer:
+                plan.placements.append(
+                    plan_layer(layer, canvas_size, assets_dir)
+                )
+        for name in STATIC_LAYER_NAMES:
+            enabled = view_overrides.get(
+                name,
+                view.get(name, defaults.get(name, False))
+            )
+            if static_layers[name] and enabled:
+                plan.placements.append(plan_static_layer(
+                    static_layers[name],
+                    canvas_size,
+                    assets_dir
+                ))
+        views.append(plan)
+    return views
+
+
+def build_plan(
+    spec: Dict[str, Any],
+    base_dir: Path,
+    aspect_ratios: Optional[List[str]] = None
+) -> RenderPlan:
+    """Compiles a scene spec into a render plan.
+
+    Args:
+        spec (Dict[str, Any]): Scene spec.
+        base_dir (Path): Directory that `assets_dir` and `output_dir`
+            are relative to.
+        aspect_ratios (Optional[List[str]], optional): Formats of the
+            spec to plan. Defaults to all formats.
+
+    Returns:
+        RenderPlan: views with resolved asset sizes and positions,
+            format by format.
+
+    Raises:
+        ValueError: if a requested aspect ratio is not a format of the
+            spec, or two views would be written to the same file.
+    """
+    formats = list(spec.get("formats") or [])
+    for aspect_ratio in aspect_ratios or []:
+        if aspect_ratio not in formats:
+            raise ValueError(
+                f"Aspect ratio {aspect_ratio} is not a format of the spec"
+                f" (formats: {', '.join(formats) or 'none'})"
+            )
+    if aspect_ratios:
+        formats = [f for f in formats if f in aspect_ratios]
+    views = []
+    for aspect_ratio in formats or [None]:
+        views.extend(_plan_format(spec, base_dir, aspect_ratio))
+    outputs = [view.output_path for view in views]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError(
+            "Views of different formats share output paths, "
+            "set a separate output_dir per format"
+        )
+    return RenderPlan(views)
+
+
+def pair_views(plan: RenderPlan) -> List[Dict[str, Any]]:
+    """Groups the outputs of a multi-format plan by view index.
+
+    Returns:
+        List[Dict[str, Any]]: per view index, the output path for
+            every aspect ratio, e.g.
+            {"index": 0, "16:9": "assets/view1.png",
+             "9:16": "assets/9x16/view1.png"}.
+    """
+    pairs: Dict[int, Dict[str, Any]] = {}
+    for view in plan.views:
+        pair = pairs.setdefault(view.index, {"index": view.index})
+        pair[view.aspect_ratio or "default"] = view.output_path
+    return [pairs[index] for index in sorted(pairs)]
+
+
+def scale_plan(plan: RenderPlan, scale: float) -> RenderPlan:
+    """Scales the canvas, asset sizes and positions of a plan,
+    e.g. for previews."""
+
+    def _scaled(values: Tuple[int, int]) -> Tuple[int, ...]:
+        return tuple(round(v * scale) for v in values)
+
+    def _scaled_size(size: Tuple[int, int]) -> Tuple[int, ...]:
+        return tuple(max(v, 1) for v in _scaled(size))
+
+    views = []
+    for view in plan.views:
+        views.append(ViewPlan(
+            output_path=view.output_path,
+            canvas_size=_scaled_size(view.canvas_size),
+            canvas_color=view.canvas_color,
+            placements=[
+                Placement(
+                    AssetKey(
+                        p.asset.path,
+                        _scaled_size(p.asset.size),
+                        p.asset.flip
+                    ),
+                    _scaled(p.position)
+                )
+                for p in view.placements
+            ],
+            output=view.output,
+            index=view.index,
+            aspect_ratio=view.aspect_ratio,
+        ))
+    return RenderPlan(views)
+
+
+def make_contact_sheet(
+    images: List[Image.Image],
+    labels: List[str],
+    columns: int = 4,
+    margin: int = 8,
+    label_height: int = 18,
+) -> Image.Image:
+    """Arranges images in a labeled grid."""
+    columns = max(1, min(columns, len(images)))
+    rows = -(-len(images) // columns)
+    cell_width = max(image.width for image in images)
+    cell_height = max(image.height for image in images) + label_height
+    sheet = Image.new(
+        "RGB",
+        (
+            columns * (cell_width + margin) + margin,
+            rows * (cell_height + margin) + margin
+        ),
+        (64, 64, 64)
+    )
+    draw = ImageDraw.Draw(sheet)
+    font = get_font(12)
+    for i, (image, label) in enumerate(zip(images, labels)):
+        x = margin + (i % columns) * (cell_width + margin)
+        y = margin + (i // columns) * (cell_height + margin)
+        draw.text((x, y + 2), label, fill=(240, 240, 240), font=font)
+        sheet.paste(image, (x, y + label_height))
+    return sheet
+
+
+def render_preview(
+    plan: RenderPlan,
+    scale: float = 0.25,
+    columns: int = 4
+) -> Image.Image:
+    """Renders all views of a plan at reduced scale from draft-decoded
+    assets and returns them as a single contact sheet."""
+    preview = scale_plan(plan, scale)
+    render = get_renderer(prepare_assets(preview, draft=True))
+    return make_contact_sheet(
+        [render(view) for view in preview.views],
+        [
+            " ".join(filter(None, [
+                view.aspect_ratio,
+                Path(view.output_path).name
+            ]))
+            for view in preview.views
+        ],
+        columns
+    )
+
+
+def _decode(
+    path: str,
+    size_hint: Optional[Tuple[int, int]] = None
+) -> Image.Image:
+    """Decodes an image as RGBA. With a size hint, JPEGs are decoded at
+    reduced scale and other images are reduced by an integer factor,
+    keeping them at least as large as the hint."""
+    with Image.open(path) as image:
+        if size_hint is None:
+            return image.convert("RGBA")
+        image.draft("RGB", size_hint)
+        image = image.convert("RGBA")
+    factor = min(
+        image.width // max(size_hint[0], 1),
+        image.height // max(size_hint[1], 1)
+    )
+    return image.reduce(factor) if factor >= 2 else image
+
+
+def _resize(
+    image: Image.Image,
+    size: Tuple[int, int],
+    resample: Image.Resampling = Image.Resampling.LANCZOS
+) -> Image.Image:
+    if image.size == size:
+        return image
+    return image.resize(size, resample)
+
+
+def prepare_assets(
+    plan: RenderPlan,
+    threads: int = 1,
+    draft: bool = False
+) -> Dict[AssetKey, Image.Image]:
+    """Decodes every source image once and resamples it once per
+    unique (size, flip) combination.
+
+    Args:
+        plan (RenderPlan): Render plan.
+        threads (int, optional): Number of threads for decoding and
+            resampling (Pillow releases the GIL while doing both).
+            Defaults to 1.
+        draft (bool, optional): Decode at reduced scale and resample
+            with a cheap filter, for previews. Defaults to False.
+
+    Returns:
+        Dict[AssetKey, Image.Image]: prepared RGBA images.
+    """
+    keys = [
+        key for key in plan.assets
+        if not key.path.startswith(STATIC_LAYER_PREFIX)
+    ]
+    paths = list(dict.fromkeys(key.path for key in keys))
+    sizes = list(dict.fromkeys((key.path, key.size) for key in keys))
+    size_hints: Dict[str, Optional[Tuple[int, int]]] = {}
+    for path, size in sizes:
+        hint = size_hints.get(path) or (0, 0)
+        size_hints[path] = (max(hint[0], size[0]), max(hint[1], size[1]))
+    if not draft:
+        size_hints = {path: None for path in paths}
+    resample = (
+        Image.Resampling.BILINEAR if draft else Image.Resampling.LANCZOS
+    )
+    with ThreadPoolExecutor(max(threads, 1)) as executor:
+        sources = dict(
+            zip(
+                paths,
+                executor.map(lambda p: _decode(p, size_hints[p]), paths)
+            )
+        )
+        resized = dict(
+            zip(
+                sizes,
+                executor.map(
+                    lambda path_size: _resize(
+                        sources[path_size[0]],
+                        path_size[1],
+                        resample
+                    ),
+                    sizes
+                )
+            )
+        )
+    prepared = {}
+    for key in keys:
+        image = resized[(key.path, key.size)]
+        prepared[key] = ImageOps.mirror(image) if key.flip else image
+    for key in plan.assets:
+        if key.path.startswith(STATIC_LAYER_PREFIX):
+            # Scaled plans refer to static layers at a smaller size.
+            prepared[key] = _resize(
+                _static_layers[key.path[len(STATIC_LAYER_PREFIX):]][0],
+                key.size,
+                resample
+            )
+    return prepared
+
+
+@lru_cache(maxsize=None)
+def _base_canvas(size: Tuple[int, int], color: Tuple[int, ...]) -> Image.Image:
+    return Image.new("RGB", size, color[:3])
+
+
+def render_view(
+    view: ViewPlan,
+    assets: Dict[AssetKey, Image.Image]
+) -> Image.Image:
+    """Composites one view from prepared assets onto a copy of
+    the cached base canvas. Static layers are prepared assets too."""
+    canvas = _base_canvas(view.canvas_size, view.canvas_color).copy()
+    for placement in view.placements:
+        image = assets[placement.asset]
+        canvas.paste(image, placement.position, image)
+    return canvas
+
+
+def save_view(
+    image: Image.Image,
+    path: str,
+    output: Dict[str, Any]
+) -> Tuple[str, str]:
+    """Saves a rendered view with the spec's output settings.
+
+    Encoding is deterministic: only the spec's settings are used and no
+    metadata (timestamps, EXIF) is written. Identical bytes are not
+    rewritten, and new bytes replace the file atomically.
+
+    Returns:
+        Tuple[str, str]: SHA-256 of the encoded image, and "written"
+            or "unchanged".
+    """
+    settings = {k: v for k, v in output.items() if k != "format"}
+    buffer = io.BytesIO()
+    image.save(buffer, output["format"], **settings)
+    data = buffer.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+    if _output_digest(path) == digest:
+        return digest, "unchanged"
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return digest, "written"
+
+
+def _output_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def get_renderer(
+    assets: Dict[AssetKey, Image.Image],
+    backend: str = "pil"
+) -> Callable[[ViewPlan], Image.Image]:
+    """Returns a function that renders views from prepared assets.
+
+    Args:
+        assets (Dict[AssetKey, Image.Image]): Prepared assets.
+        backend (str, optional): "pil" (Pillow paste) or "numpy"
+            (premultiplied bounding-box blending, see compositor_numpy.py).
+            Defaults to "pil".
+    """
+    if backend == "numpy":
+        # Optional dependency, imported only when selected.
+        from compositor_numpy import ArrayRenderer
+        return ArrayRenderer(assets).render
+    if backend != "pil":
+        raise ValueError(f"Unknown backend: {backend}")
+    return lambda view: render_view(view, assets)
+
+
+def _render_and_save(
+    view: ViewPlan,
+    render: Callable[[ViewPlan], Image.Image]
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    digest, status = save_view(render(view), view.output_path, view.output)
+    return {
+        "output": view.output_path,
+        "index": view.index,
+        "aspect_ratio": view.aspect_ratio,
+        "seconds": round(time.perf_counter() - start, 4),
+        "worker": os.getpid(),
+        "status": status,
+        "sha256": digest,
+    }
+
+
+def _share_assets(
+    assets: Dict[AssetKey, Image.Image]
+) -> Tuple[shared_memory.SharedMemory, List[Tuple[AssetKey, int]]]:
+    """Copies prepared RGBA assets into one shared memory block.
+
+    Returns:
+        Tuple[shared_memory.SharedMemory, List[Tuple[AssetKey, int]]]:
+            the shared memory block and the offset of every asset.
+    """
+    total = sum(len(image.mode) * image.width * image.height
+                for image in assets.values())
+    block = shared_memory.SharedMemory(create=True, size=max(total, 1))
+    index = []
+    offset = 0
+    for key, image in assets.items():
+        data = image.tobytes()
+        block.buf[offset:offset + len(data)] = data
+        index.append((key, offset))
+        offset += len(data)
+    return block, index
+
+
+# Per-worker state, set by _init_worker.
+_worker_block: Optional[shared_memory.SharedMemory] = None
+_worker_render: Optional[Callable[[ViewPlan], Image.Image]] = None
+
+
+def _init_worker(
+    block_name: str,
+    index: List[Tuple[AssetKey, int]],
+    backend: str
+):
+    """Maps the shared prepared assets into a worker without copying."""
+    global _worker_block, _worker_render
+    _worker_block = shared_memory.SharedMemory(name=block_name)
+    assets = {}
+    for key, offset in index:
+        length = 4 * key.size[0] * key.size[1]
+        assets[key] = Image.frombuffer(
+            "RGBA",
+            key.size,
+            _worker_block.buf[offset:offset + length],
+            "raw",
+            "RGBA",
+            0,
+            1
+        )
+    _worker_render = get_renderer(assets, backend)
+
+
+def _render_in_worker(view: ViewPlan) -> Dict[str, Any]:
+    return _render_and_save(view, _worker_render)
+
+
+def view_digest(view: ViewPlan, backend: str) -> str:
+    """Digest of everything a view's output depends on: canvas, output
+    settings, source file contents, sizes, positions and the renderer."""
+    layers = []
+    for placement in view.placements:
+        source = placement.asset.path
+        if not source.startswith(STATIC_LAYER_PREFIX):
+            # Static layer keys are content digests already.
+            source = _path_digest(source)
+        layers.append([
+            source,
+            placement.asset.size,
+            placement.asset.flip,
+            placement.position
+        ])
+    description = json.dumps(
+        [
+            view.canvas_size,
+            view.canvas_color,
+            view.output,
+            layers,
+            backend,
+            PIL.__version__,
+            RENDER_VERSION,
+        ],
+        sort_keys=True
+    )
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+def _load_manifest(directory: Path) -> Dict[str, Any]:
+    try:
+        return json.loads((directory / MANIFEST_FILE_NAME).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_manifest(directory: Path, manifest: Dict[str, Any]):
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp_path = directory / f"{MANIFEST_FILE_NAME}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    tmp_path.replace(directory / MANIFEST_FILE_NAME)
+
+
+def render_plan(
+    plan: RenderPlan,
+    workers: int = 1,
+    backend: str = "pil",
+    force: bool = False
+) -> List[Dict[str, Any]]:
+    """Renders and saves the views of a plan whose inputs changed.
+
+    A manifest in every output directory records the input digest
+    (see view_digest) and the output hash of each view. A view is
+    skipped if its input digest is unchanged and its output file still
+    has the recorded hash.
+
+    Args:
+        plan (RenderPlan): Render plan.
+        workers (int, optional): Number of worker processes, 0 for
+            one per CPU core. Defaults to 1.
+        backend (str, optional): Compositing backend, see get_renderer.
+            Defaults to "pil".
+        force (bool, optional): Render all views. Defaults to False.
+
+    Returns:
+        List[Dict[str, Any]]: output path, view index, aspect ratio,
+            status ("skipped", "written" or "unchanged"), render time and
+            worker process ID of every view, in plan order.
+    """
+    manifests: Dict[Path, Dict[str, Any]] = {}
+    digests = {}
+    stale = []
+    results = {}
+    for view in plan.views:
+        path = Path(view.output_path)
+        if path.parent not in manifests:
+            manifests[path.parent] = _load_manifest(path.parent)
+        digests[view.output_path] = view_digest(view, backend)
+        entry = manifests[path.parent].get(path.name, {})
+        if (
+            not force
+            and entry.get("inputs") == digests[view.output_path]
+            and entry.get("sha256") == _output_digest(view.output_path)
+        ):
+            results[view.output_path] = {
+                "output": view.output_path,
+                "index": view.index,
+                "aspect_ratio": view.aspect_ratio,
+                "seconds": 0.0,
+                "worker": None,
+                "status": "skipped",
+                "sha256": entry["sha256"],
+            }
+        else:
+            stale.append(view)
+    if stale:
+        for result in _render_views(RenderPlan(stale), workers, backend):
+            path = Path(result["output"])
+            results[result["output"]] = result
+            manifests[path.parent][path.name] = {
+                "inputs": digests[result["output"]],
+                "sha256": result["sha256"],
+            }
+        for directory, manifest in manifests.items():
+            _save_manifest(directory, manifest)
+    return [results[view.output_path] for view in plan.views]
+
+
+def _render_views(
+    plan: RenderPlan,
+    workers: int,
+    backend: str
+) -> List[Dict[str, Any]]:
+    """Renders and saves all views of a plan.
+
+    With more than one worker, views are distributed across a process
+    pool. Prepared assets are placed in shared memory once, so workers
+    receive only the small view plans.
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(plan.views))
+    assets = prepare_assets(plan, threads=workers)
+    if workers <= 1:
+        render = get_renderer(assets, backend)
+        return [_render_and_save(view, render) for view in plan.views]
+    block, index = _share_assets(assets)
+    del assets
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(block.name, index, backend),
+        ) as executor:
+            return list(executor.map(
+                _render_in_worker,
+                plan.views,
+                chunksize=max(1, len(plan.views) // (workers * 4))
+            ))
+    finally:
+        block.close()
+        block.unlink()
+
+
+def render_spec(
+    spec_path: str,
+    workers: int = 1,
+    backend: str = "pil",
+    aspect_ratios: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """Renders all views of a scene spec file, in all its formats
+    unless `aspect_ratios` are given.
+    Paths in the spec are relative to the current directory."""
+    plan = build_plan(load_spec(spec_path), Path("."), aspect_ratios)
+    return render_plan(plan, workers, backend)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render view images from a scene spec."
+    )
+    parser.add_argument("spec", help="Scene spec (JSON or YAML).")
+    parser.add_argument(
+        "--workers",
+        "-j",
+        type=int,
+        default=1,
+        help="Worker processes for batch rendering, 0 for all CPU cores."
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["pil", "numpy"],
+        default="pil",
+        help="Compositing backend."
+    )
+    parser.add_argument(
+        "--preview",
+        nargs="?",
+        const="preview.png",
+        metavar="PATH",
+        help="Only write a low-resolution contact sheet of all views "
+             "(default: preview.png)."
+    )
+    parser.add_argument(
+        "--preview-scale",
+        type=float,
+        default=0.25,
+        help="Preview size relative to the canvas."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Render all views, even if their inputs are unchanged."
+    )
+    parser.add_argument(
+        "--aspect-ratio",
+        action="append",
+        dest="aspect_ratios",
+        metavar="RATIO",
+        help="Only render this format of the spec (e.g. 9:16), "
+             "can be repeated. Defaults to all formats."
+    )
+    args = parser.parse_args()
+    start = time.perf_counter()
+    plan = build_plan(load_spec(args.spec), Path("."), args.aspect_ratios)
+    if args.preview:
+        render_preview(plan, args.preview_scale).save(args.preview)
+        print(
+            f"Preview of {len(plan.views)} views: {args.preview} "
+            f"({time.perf_counter() - start:.2f}s)"
+        )
+        return
+    print(
+        f"Rendering {len(plan.views)} views "
+        f"from {len(plan.assets)} prepared assets..."
+    )
+    results = render_plan(plan, args.workers, args.backend, args.force)
+    for result in results:
+        if result["status"] == "skipped":
+            continue
+        print(
+            f"{result['status'].capitalize()}: {result['output']} "
+            f"({result['seconds']:.3f}s, worker {result['worker']})"
+        )
+    if any(view.aspect_ratio for view in plan.views):
+        for pair in pair_views(plan):
+            outputs = ", ".join(
+                f"{key} {value}" for key, value in pair.items()
+                if key != "index"
+            )
+            print(f"View {pair['index'] + 1}: {outputs}")
+    elapsed = time.perf_counter() - start
+    render_seconds = sum(result["seconds"] for result in results)
+    print(
+        f"Done in {elapsed:.2f}s: {len(results) / elapsed:.1f} views/s, "
+        f"{render_seconds:.2f}s of render time "
+        f"on {len({r['worker'] for r in results} - {None})} worker(s), "
+        f"{sum(r['status'] == 'skipped' for r in results)} views up to date"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""NumPy compositing backend for compositor.py.
+
+Prepared assets are converted once into premultiplied arrays, cropped
+to the bounding box of their visible pixels. A view is rendered into an
+RGB array: opaque assets are copied, translucent ones are blended over
+their bounding box only, and the array becomes the output image without
+any full-frame RGBA conversions.
+
+Blending uses integer math: color channels are premultiplied by alpha
+in the 0..255*255 range (uint16), so that
+    out = (premultiplied + canvas * (255 - alpha) + 127) // 255
+stays within uint16 and rounds like Pillow's paste with a mask.
+Output matches the Pillow backend within MAX_PIXEL_DIFFERENCE.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from compositor import AssetKey, ViewPlan
+
+# Largest per-channel difference to the Pillow backend.
+MAX_PIXEL_DIFFERENCE = 2
+
+
+@dataclass
+class ArrayAsset:
+    """An asset prepared for blending, cropped to its visible pixels."""
+    offset: Tuple[int, int]
+    # Opaque: RGB uint8. Translucent: premultiplied RGB uint16.
+    color: np.ndarray
+    # 255 - alpha as uint16, None for opaque assets.
+    inverse_alpha: Optional[np.ndarray]
+
+
+def to_array_asset(image: Image.Image) -> Optional[ArrayAsset]:
+    """Converts an RGBA image into an ArrayAsset,
+    None if the image is fully transparent."""
+    rgba = np.asarray(image.convert("RGBA"))
+    alpha = rgba[..., 3]
+    rows = np.flatnonzero(alpha.any(axis=1))
+    columns = np.flatnonzero(alpha.any(axis=0))
+    if rows.size == 0:
+        return None
+    top, bottom = rows[0], rows[-1] + 1
+    left, right = columns[0], columns[-1] + 1
+    rgba = rgba[top:bottom, left:right]
+    alpha = rgba[..., 3:4].astype(np.uint16)
+    if (alpha == 255).all():
+        return ArrayAsset(
+            (int(left), int(top)),
+            np.ascontiguousarray(rgba[..., :3]),
+            None
+        )
+    return ArrayAsset(
+        (int(left), int(top)),
+        rgba[..., :3].astype(np.uint16) * alpha,
+        255 - alpha,
+    )
+
+
+class ArrayRenderer:
+    """Renders views from prepared assets with NumPy.
+
+    Assets are converted on first use and kept for the lifetime
+    of the renderer, i.e. once per process.
+    """
+
+    def __init__(self, assets: Dict[AssetKey, Image.Image]):
+        self._assets = assets
+        self._arrays: Dict[AssetKey, Optional[ArrayAsset]] = {}
+        self._canvases: Dict[Tuple, np.ndarray] = {}
+
+    def _array(self, key: AssetKey) -> Optional[ArrayAsset]:
+        if key not in self._arrays:
+            self._arrays[key] = to_array_asset(self._assets[key])
+        return self._arrays[key]
+
+    def _canvas(self, view: ViewPlan) -> np.ndarray:
+        key = (view.canvas_size, view.canvas_color)
+        if key not in self._canvases:
+            width, height = view.canvas_size
+            canvas = np.empty((height, width, 3), dtype=np.uint8)
+            canvas[...] = view.canvas_color[:3]
+            self._canvases[key] = canvas
+        return self._canvases[key].copy()
+
+    def render(self, view: ViewPlan) -> Image.Image:
+        """Composites one view."""
+        canvas = self._canvas(view)
+        height, width = canvas.shape[:2]
+        for placement in view.placements:
+            asset = self._array(placement.asset)
+            if asset is None:
+                continue
+            x = placement.position[0] + asset.offset[0]
+            y = placement.position[1] + asset.offset[1]
+            asset_height, asset_width = asset.color.shape[:2]
+            # Clip to the canvas.
+            left, top = max(x, 0), max(y, 0)
+            right = min(x + asset_width, width)
+            bottom = min(y + asset_height, height)
+            if left >= right or top >= bottom:
+                continue
+            source = (
+                slice(top - y, bottom - y),
+                slice(left - x, right - x)
+            )
+            target = canvas[top:bottom, left:right]
+            if asset.inverse_alpha is None:
+                target[...] = asset.color[source]
+                continue
+            blended = target * asset.inverse_alpha[source]
+            blended += asset.color[source]
+            blended += 127
+            blended //= 255
+            target[...] = blended
+        return Image.fromarray(canvas, "RGB")
+
+
+def max_difference(a: Image.Image, b: Image.Image) -> int:
+    """Largest per-channel difference between two images."""
+    return int(
+        np.abs(
+            np.asarray(a, dtype=np.int16) - np.asarray(b, dtype=np.int16)
+        ).max()
+    )
@@ -47,6 +47,10 @@ echo "MCP Server deployed at ${MEDIA_MCP_SERVER_URL}"
 
 SERVICE_NAME="${AGENT_ENGINE_NAME//_/-}"
 echo "Deploying the agent to Cloud Run..."
+# The ADK Cloud Run image (python:3.11-slim) has no ffmpeg and ffprobe,
+# so the deployed agent doesn't register `merge_video_segments` and offers
+# the local merge command (agents/video_avatar_agent/video_merge.py) instead.
+echo "Note: the agent image has no ffmpeg, video segments are merged locally."
 adk deploy cloud_run \
     --project="${GOOGLE_CLOUD_PROJECT}" \
     --region="${GOOGLE_CLOUD_LOCATION}" \
@@ -0,0 +1,604 @@
+#!/usr/bin/env python3
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Renders Desmos-style graph frame sequences from question records.
+
+The `graph` section of a question record describes the equations,
+viewports and highlight points:
+    "graph": {
+        "viewport": [-10, 10, -10, 10],
+        "zoom": [-10, 10, -10, 30],
+        "curves": [
+            {"label": "y = 4x", "y": "4*x"},
+            {"label": "y = x² − 12", "y": "x**2 - 12"}
+        ],
+        "points": [{"x": 6, "y": 24, "label": "(6, 24)"}],
+        "answer": {"label": "x = 6", "x": 6}
+    }
+
+Viewports are [x_min, x_max, y_min, y_max]. A curve is either `y` as
+an expression of x (numbers, + - * / ** ^, and the functions in
+FUNCTIONS) or a vertical line at `x`.
+
+The frame sequence mirrors the hand-captured assets/desmos series:
+the empty grid, one frame per added curve, the zoomed viewport, the
+highlighted points and the final answer. Frames whose section is
+missing are left out.
+
+The window chrome, and the grid and axes of each viewport, are
+rendered once and reused by every frame. Curves are sampled with
+vectorized NumPy and drawn on a supersampled layer for antialiasing.
+
+Usage:
+    python graph_frames.py questions/sat_system_of_equations.json -o graphs
+"""
+
+import argparse
+import ast
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+import math
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from compositor import get_font, save_view
+from question_screens import load_question_bank
+
+Viewport = Tuple[float, float, float, float]
+
+FRAME_SIZE = (1200, 828)
+FRAME_PREFIX = "desmos"
+TOP_BAR_HEIGHT = 46
+TOOLBAR_HEIGHT = 48
+PANEL_WIDTH = 400
+ROW_HEIGHT = 62
+# Curves and points are drawn at this scale, then reduced.
+SUPERSAMPLE = 2
+# Curve samples per output pixel of the graph width.
+SAMPLES_PER_PIXEL = 2
+CURVE_WIDTH = 3
+POINT_RADIUS = 6
+
+# Desmos expression colors, assigned in order.
+COLORS = [
+    (199, 68, 64),
+    (45, 112, 179),
+    (56, 140, 70),
+    (96, 66, 166),
+    (250, 126, 25),
+    (0, 0, 0),
+]
+TOP_BAR_COLOR = (42, 42, 42)
+TOOLBAR_COLOR = (241, 241, 241)
+ROW_LINE_COLOR = (222, 222, 222)
+ACTIVE_COLOR = (47, 114, 220)
+INDEX_COLOR = (120, 120, 120)
+MINOR_GRID_COLOR = (235, 235, 235)
+MAJOR_GRID_COLOR = (204, 204, 204)
+AXIS_COLOR = (30, 30, 30)
+TICK_LABEL_COLOR = (30, 30, 30)
+
+FUNCTIONS = {
+    "sqrt": np.sqrt,
+    "abs": np.abs,
+    "exp": np.exp,
+    "log": np.log,
+    "ln": np.log,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load,
+    ast.Constant, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub,
+    ast.UAdd,
+)
+
+
+@dataclass(frozen=True)
+class GraphItem:
+    """One entry of the expression list: a curve y = f(x),
+    a vertical line or a point."""
+    label: str
+    color: Tuple[int, int, int]
+    expression: Optional[str] = None
+    x: Optional[float] = None
+    y: Optional[float] = None
+
+    @property
+    def kind(self) -> str:
+        if self.expression is not None:
+            return "curve"
+        return "line" if self.y is None else "point"
+
+
+@dataclass(frozen=True)
+class GraphFrame:
+    """One frame of a sequence: a viewport and the visible items."""
+    name: str
+    viewport: Viewport
+    items: Tuple[GraphItem, ...]
+
+
+@lru_cache(maxsize=None)
+def compile_expression(expression: str):
+    """Compiles an expression of x into code for vectorized evaluation.
+
+    Raises:
+        ValueError: if the expression uses anything but numbers, x,
+            arithmetic operators, CONSTANTS and FUNCTIONS.
+    """
+    tree = ast.parse(expression.replace("^", "**"), mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported expression: {expression}")
+        if isinstance(node, ast.Name) and node.id not in (
+            {"x"} | FUNCTIONS.keys() | CONSTANTS.keys()
+        ):
+            raise ValueError(f"Unknown name '{node.id}' in: {expression}")
+        if isinstance(node, ast.Call) and (
+            not isinstance(node.func, ast.Name)
+            or node.func.id not in FUNCTIONS
+            or node.keywords
+        ):
+            raise ValueError(f"Unsupported call in: {expression}")
+    return compile(tree, "<graph>", "eval")
+
+
+def evaluate(expression: str, xs: np.ndarray) -> np.ndarray:
+    """Evaluates an expression of x for all samples at once."""
+    code = compile_expression(expression)
+    with np.errstate(all="ignore"):
+        ys = eval(code, {"__builtins__": {}}, {**FUNCTIONS, **CONSTANTS, "x": xs})
+    return np.broadcast_to(np.asarray(ys, dtype=np.float64), xs.shape)
+
+
+def nice_step(span: float, target: int = 10) -> float:
+    """Returns a 1, 2 or 5 times power of ten step that divides
+    the span into about `target` intervals."""
+    raw = span / target
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for mantissa in (1, 2, 5, 10):
+        if mantissa * magnitude >= raw * 0.999:
+            return mantissa * magnitude
+    return 10 * magnitude
+
+
+def _minor_step(step: float) -> float:
+    mantissa = round(step / 10 ** math.floor(math.log10(step)))
+    return step / (4 if mantissa == 2 else 5)
+
+
+def _ticks(low: float, high: float, step: float) -> np.ndarray:
+    return np.arange(math.ceil(low / step), math.floor(high / step) + 1) * step
+
+
+def graph_box(size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """Returns the graph paper region of a frame as (left, top, right, bottom)."""
+    return (PANEL_WIDTH, TOP_BAR_HEIGHT, size[0], size[1])
+
+
+class _Mapping:
+    """Maps graph coordinates to pixels of the graph region at a scale."""
+
+    def __init__(self, viewport: Viewport, width: int, height: int):
+        x_min, x_max, y_min, y_max = viewport
+        self.x_min, self.y_max = x_min, y_max
+        self.x_scale = width / (x_max - x_min)
+        self.y_scale = height / (y_max - y_min)
+
+    def x(self, values):
+        return (np.asarray(values) - self.x_min) * self.x_scale
+
+    def y(self, values):
+        return (self.y_max - np.asarray(values)) * self.y_scale
+
+
+def _tick_label(value: float) -> str:
+    return f"{value:.10g}"
+
+
+@lru_cache(maxsize=None)
+def _chrome(size: Tuple[int, int]) -> Image.Image:
+    """Renders the window without expressions or graph paper."""
+    width, height = size
+    image = Image.new("RGB", size, (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width, TOP_BAR_HEIGHT - 1), fill=TOP_BAR_COLOR)
+    title_font = get_font(28)
+    draw.text(
+        (width // 2, TOP_BAR_HEIGHT // 2),
+        "desmos",
+        fill=(255, 255, 255),
+        font=title_font,
+        anchor="mm"
+    )
+    draw.rectangle(
+        (0, TOP_BAR_HEIGHT, PANEL_WIDTH - 1, TOP_BAR_HEIGHT + TOOLBAR_HEIGHT - 1),
+        fill=TOOLBAR_COLOR
+    )
+    draw.line(
+        (PANEL_WIDTH - 1, TOP_BAR_HEIGHT, PANEL_WIDTH - 1, height),
+        fill=ROW_LINE_COLOR
+    )
+    return image
+
+
+@lru_cache(maxsize=32)
+def _grid_layer(size: Tuple[int, int], viewport: Viewport) -> Image.Image:
+    """Renders the chrome plus grid, axes and tick labels of a viewport.
+    Shared by all frames with the same viewport."""
+    image = _chrome(size).copy()
+    left, top, right, bottom = graph_box(size)
+    width, height = right - left, bottom - top
+    paper = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(paper)
+    mapping = _Mapping(viewport, width, height)
+    x_min, x_max, y_min, y_max = viewport
+    x_step = nice_step(x_max - x_min)
+    y_step = nice_step(y_max - y_min)
+    for step, color in (
+        ((_minor_step(x_step), _minor_step(y_step)), MINOR_GRID_COLOR),
+        ((x_step, y_step), MAJOR_GRID_COLOR),
+    ):
+        for px in np.round(mapping.x(_ticks(x_min, x_max, step[0]))):
+            draw.line((px, 0, px, height), fill=color)
+        for py in np.round(mapping.y(_ticks(y_min, y_max, step[1]))):
+            draw.line((0, py, width, py), fill=color)
+
+    # Axes, and tick labels along them, kept inside the paper when
+    # an axis is out of view.
+    axis_x = int(round(float(mapping.x(0.0))))
+    axis_y = int(round(float(mapping.y(0.0))))
+    if 0 <= axis_x <= width:
+        draw.line((axis_x, 0, axis_x, height), fill=AXIS_COLOR, width=2)
+    if 0 <= axis_y <= height:
+        draw.line((0, axis_y, width, axis_y), fill=AXIS_COLOR, width=2)
+    font = get_font(14)
+    label_y = min(max(axis_y + 6, 2), height - 18)
+    for value in _ticks(x_min, x_max, x_step):
+        if value == 0:
+            continue
+        half = draw.textlength(_tick_label(value), font=font) / 2 + 2
+        draw.text(
+            (min(max(float(mapping.x(value)), half), width - half), label_y),
+            _tick_label(value),
+            fill=TICK_LABEL_COLOR,
+            font=font,
+            anchor="ma"
+        )
+    label_x = min(max(axis_x - 6, 24), width - 2)
+    for value in _ticks(y_min, y_max, y_step):
+        if value == 0:
+            continue
+        draw.text(
+            (label_x, min(max(float(mapping.y(value)), 9), height - 9)),
+            _tick_label(value),
+            fill=TICK_LABEL_COLOR,
+            font=font,
+            anchor="rm"
+        )
+    if 0 <= axis_x <= width and 0 <= axis_y <= height:
+        draw.text(
+            (axis_x - 6, axis_y + 6),
+            "0",
+            fill=TICK_LABEL_COLOR,
+            font=font,
+            anchor="ra"
+        )
+    image.paste(paper, (left, top))
+    return image
+
+
+def sample_curve(
+    expression: str,
+    mapping: _Mapping,
+    width: int,
+    height: int
+) -> List[np.ndarray]:
+    """Samples a curve across the graph width and returns the visible
+    runs as (n, 2) pixel arrays, split where the curve is undefined."""
+    columns = np.linspace(0, width, width * SAMPLES_PER_PIXEL // SUPERSAMPLE + 1)
+    xs = mapping.x_min + columns / mapping.x_scale
+    rows = mapping.y(evaluate(expression, xs))
+    # Keep points just beyond the edges so segments leave the frame,
+    # and clamp far away ones to avoid huge coordinates.
+    valid = np.isfinite(rows)
+    rows = np.clip(np.where(valid, rows, 0.0), -height, 2 * height)
+    points = np.column_stack((columns, rows))
+    breaks = np.flatnonzero(np.diff(valid.astype(np.int8))) + 1
+    return [
+        run for run, ok in zip(
+            np.split(points, breaks),
+            np.split(valid, breaks)
+        )
+        if ok[0] and len(run) > 1
+    ]
+
+
+def _draw_items(
+    size: Tuple[int, int],
+    viewport: Viewport,
+    items: Tuple[GraphItem, ...]
+) -> Image.Image:
+    """Draws curves, lines and points on a transparent layer of the
+    graph region, antialiased by supersampling."""
+    left, top, right, bottom = graph_box(size)
+    width, height = (right - left) * SUPERSAMPLE, (bottom - top) * SUPERSAMPLE
+    # Items are opaque, so the layer can be drawn premultiplied directly.
+    layer = Image.new("RGBa", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    mapping = _Mapping(viewport, width, height)
+    line_width = CURVE_WIDTH * SUPERSAMPLE
+    for item in items:
+        if item.kind == "curve":
+            for run in sample_curve(item.expression, mapping, width, height):
+                draw.line(run.ravel().tolist(), fill=item.color,
+                          width=line_width)
+        elif item.kind == "line":
+            px = float(mapping.x(item.x))
+            draw.line((px, 0, px, height), fill=item.color,
+                      width=line_width + SUPERSAMPLE)
+    radius = POINT_RADIUS * SUPERSAMPLE
+    for item in items:
+        if item.kind != "point":
+            continue
+        px, py = float(mapping.x(item.x)), float(mapping.y(item.y))
+        draw.ellipse(
+            (px - radius, py - radius, px + radius, py + radius),
+            fill=item.color
+        )
+    # Reduced premultiplied, so edges don't pick up the transparent black.
+    return layer.reduce(SUPERSAMPLE).convert("RGBA")
+
+
+def _draw_expressions(
+    image: Image.Image,
+    items: Tuple[GraphItem, ...],
+    active: bool
+):
+    """Draws the expression list, with the last item active."""
+    draw = ImageDraw.Draw(image)
+    index_font = get_font(11)
+    label_font = get_font(24)
+    top = TOP_BAR_HEIGHT + TOOLBAR_HEIGHT
+    for index, item in enumerate(items + (None,)):
+        y0, y1 = top + index * ROW_HEIGHT, top + (index + 1) * ROW_HEIGHT
+        if active and index == len(items) - 1:
+            draw.rectangle((0, y0, 37, y1), fill=ACTIVE_COLOR)
+            draw.rectangle((0, y0, PANEL_WIDTH - 1, y1), outline=ACTIVE_COLOR)
+            index_color = (255, 255, 255)
+        else:
+            draw.line((0, y1, PANEL_WIDTH - 1, y1), fill=ROW_LINE_COLOR)
+            index_color = INDEX_COLOR
+        draw.text((3, y0 + 2), str(index + 1), fill=index_color,
+                  font=index_font)
+        if item is None:
+            break
+        cx, cy = 19, y0 + ROW_HEIGHT // 2
+        draw.ellipse((cx - 14, cy - 14, cx + 14, cy + 14), fill=item.color)
+        if item.kind == "point":
+            draw.ellipse((cx - 3, cy - 3, cx + 3, cy + 3), fill=(255, 255, 255))
+        else:
+            draw.line((cx - 8, cy, cx + 8, cy), fill=(255, 255, 255), width=3)
+        draw.text((56, cy), item.label, fill=(0, 0, 0), font=label_font,
+                  anchor="lm")
+
+
+def render_frame(
+    frame: GraphFrame,
+    size: Tuple[int, int] = FRAME_SIZE
+) -> Image.Image:
+    """Renders one frame on top of the cached grid layer."""
+    image = _grid_layer(size, frame.viewport).copy()
+    _draw_expressions(image, frame.items, active=bool(frame.items))
+    if not frame.items:
+        return image
+    left, top, right, bottom = graph_box(size)
+    layer = _draw_items(size, frame.viewport, frame.items)
+    image.paste(layer, (left, top), layer)
+    # Point labels are drawn at full resolution.
+    draw = ImageDraw.Draw(image)
+    font = get_font(22)
+    mapping = _Mapping(frame.viewport, right - left, bottom - top)
+    for item in frame.items:
+        if item.kind == "point":
+            draw.text(
+                (
+                    left + float(mapping.x(item.x)) + 2 * POINT_RADIUS,
+                    top + float(mapping.y(item.y))
+                ),
+                item.label,
+                fill=item.color,
+                font=font,
+                anchor="lm"
+            )
+    return image
+
+
+def _slug(text: str) -> str:
+    text = text.replace("=", " equals ").replace("²", "^2")
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def _viewport(value: Any) -> Viewport:
+    x_min, x_max, y_min, y_max = (float(v) for v in value)
+    if x_min >= x_max or y_min >= y_max:
+        raise ValueError(f"Empty viewport: {value}")
+    return (x_min, x_max, y_min, y_max)
+
+
+def build_frames(graph: Dict[str, Any]) -> List[GraphFrame]:
+    """Builds the progressive frame sequence of a graph spec."""
+    colors = iter(COLORS * 4)
+
+    def item(spec: Dict[str, Any], default_label: str) -> GraphItem:
+        color = tuple(spec["color"]) if "color" in spec else next(colors)
+        if isinstance(spec.get("y"), str):
+            compile_expression(spec["y"])
+            return GraphItem(spec.get("label", default_label), color,
+                             expression=spec["y"])
+        return GraphItem(
+            spec.get("label", default_label),
+            color,
+            x=float(spec["x"]),
+            y=None if spec.get("y") is None else float(spec["y"])
+        )
+
+    curves = [
+        item(spec, f"y = {spec.get('y')}" if "y" in spec else f"x = {spec['x']}")
+        for spec in graph.get("curves", [])
+    ]
+    points = [
+        item(spec, f"({spec['x']:g}, {spec['y']:g})")
+        for spec in graph.get("points", [])
+    ]
+    answer = graph.get("answer")
+    answer_item = item(answer, f"x = {answer.get('x')}") if answer else None
+
+    viewport = _viewport(graph.get("viewport", [-10, 10, -10, 10]))
+    zoom = _viewport(graph["zoom"]) if "zoom" in graph else None
+    frames = [GraphFrame("empty", viewport, ())]
+    for count, curve in enumerate(curves, 1):
+        name = (
+            "both_equations" if count == 2 == len(curves)
+            else _slug(curve.label)
+        )
+        frames.append(GraphFrame(name, viewport, tuple(curves[:count])))
+    view = viewport
+    if zoom:
+        view = zoom
+        frames.append(GraphFrame("zoomed_intersections", view, tuple(curves)))
+    if points:
+        frames.append(GraphFrame(
+            "intersection_highlighted", view, tuple(curves + points)
+        ))
+    if answer_item:
+        frames.append(GraphFrame(
+            "final_answer", view, tuple(curves + points + [answer_item])
+        ))
+    return frames
+
+
+def render_graph(
+    question: Dict[str, Any],
+    output_dir: str,
+    compress_level: int = 6
+) -> Dict[str, Any]:
+    """Renders and saves the graph frames of a question as
+    `<output_dir>/<id>/desmos_<NN>_<name>.png`.
+
+    Returns:
+        Dict[str, Any]: question ID, output paths, how many frames
+            were written, and render time.
+    """
+    start = time.perf_counter()
+    graph = question["graph"]
+    size = tuple(graph.get("size", FRAME_SIZE))
+    outputs, written = [], 0
+    for index, frame in enumerate(build_frames(graph), 1):
+        path = os.path.join(
+            output_dir,
+            question["id"],
+            f"{FRAME_PREFIX}_{index:02d}_{frame.name}.png"
+        )
+        _, status = save_view(
+            render_frame(frame, size),
+            path,
+            {"format": "PNG", "compress_level": compress_level}
+        )
+        written += status == "written"
+        outputs.append(path)
+    return {
+        "id": question["id"],
+        "outputs": outputs,
+        "written": written,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def render_graph_bank(
+    questions: List[Dict[str, Any]],
+    output_dir: str,
+    workers: int = 1,
+    compress_level: int = 6
+) -> List[Dict[str, Any]]:
+    """Renders the graph frames of all questions with a `graph` section,
+    optionally in a process pool. Chrome and grid layers are cached
+    per worker.
+
+    Returns:
+        List[Dict[str, Any]]: results of render_graph, in bank order.
+    """
+    questions = [q for q in questions if q.get("graph")]
+    if not questions:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(questions))
+    if workers <= 1:
+        return [render_graph(q, output_dir, compress_level) for q in questions]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            render_graph,
+            questions,
+            [output_dir] * len(questions),
+            [compress_level] * len(questions),
+            chunksize=max(1, len(questions) // (workers * 4))
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render Desmos-style graph frames from a question bank."
+    )
+    parser.add_argument("bank", help="Question bank (JSON or JSON Lines).")
+    parser.add_argument("--output-dir", "-o", default="graphs")
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        default=6,
+        help="PNG compression level (0-9)."
+    )
+    parser.add_argument(
+        "--workers",
+        "-j",
+        type=int,
+        default=1,
+        help="Worker processes, 0 for all CPU cores."
+    )
+    args = parser.parse_args()
+    start = time.perf_counter()
+    results = render_graph_bank(
+        load_question_bank(args.bank),
+        args.output_dir,
+        args.workers,
+        args.compress_level
+    )
+    elapsed = time.perf_counter() - start
+    frames = sum(len(result["outputs"]) for result in results)
+    for result in results:
+        print(f"✓ {result['id']}: {len(result['outputs'])} frames "
+              f"({result['written']} written) in {result['seconds']:.3f}s")
+    print(f"\n{frames} frames for {len(results)} questions "
+          f"in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
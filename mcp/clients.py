@@ -0,0 +1,107 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Registry of long-lived, connection-pooled GenAI and Storage clients.
+
+Creating a client per request pays for authentication and TLS handshakes
+every time. Clients in this registry are created once per process
+and keep their HTTP connections alive between calls.
+"""
+
+import logging
+import os
+import threading
+from typing import Optional
+
+import httpx
+from google.adk.models.google_llm import Gemini
+from google.cloud.storage import Client as StorageClient
+from google.genai import Client as GenAIClient
+from google.genai import types
+from requests.adapters import HTTPAdapter
+
+# Number of pooled connections per client.
+CLIENT_POOL_SIZE = int(os.environ.get("CLIENT_POOL_SIZE", "64"))
+# Model used to open GenAI connections at startup.
+PREWARM_MODEL = "gemini-2.5-flash-image"
+
+_lock = threading.Lock()
+_genai_client: Optional[GenAIClient] = None
+_storage_client: Optional[StorageClient] = None
+
+
+def get_genai_client() -> GenAIClient:
+    """Returns the process-wide GenAI client."""
+    global _genai_client
+    if _genai_client is None:
+        with _lock:
+            if _genai_client is None:
+                limits = httpx.Limits(
+                    max_connections=CLIENT_POOL_SIZE,
+                    max_keepalive_connections=CLIENT_POOL_SIZE,
+                )
+                _genai_client = GenAIClient(
+                    http_options=types.HttpOptions(
+                        # Same tracking headers as ADK's own Gemini client.
+                        headers=Gemini()._tracking_headers,
+                        client_args={"limits": limits},
+                        async_client_args={"limits": limits},
+                    )
+                )
+    return _genai_client
+
+
+def get_storage_client() -> StorageClient:
+    """Returns the process-wide Cloud Storage client."""
+    global _storage_client
+    if _storage_client is None:
+        with _lock:
+            if _storage_client is None:
+                client = StorageClient(
+                    project=os.environ.get("GOOGLE_CLOUD_PROJECT")
+                )
+                # Keep enough connections alive for concurrent requests.
+                client._http.mount(
+                    "https://",
+                    HTTPAdapter(
+                        pool_connections=CLIENT_POOL_SIZE,
+                        pool_maxsize=CLIENT_POOL_SIZE
+                    )
+                )
+                _storage_client = client
+    return _storage_client
+
+
+async def prewarm_clients(bucket_name: Optional[str] = None):
+    """Creates all clients and opens their connections, so the first
+    requests don't pay for authentication and TLS handshakes.
+    Must run on the event loop that serves the requests.
+
+    Args:
+        bucket_name (Optional[str], optional): Bucket to fetch
+            for warming up the Storage client. Defaults to None.
+    """
+    genai_client = get_genai_client()
+    storage_client = get_storage_client()
+    try:
+        await genai_client.aio.models.get(model=PREWARM_MODEL)
+    except Exception as e:
+        logging.warning(f"Could not pre-warm GenAI client: {e}")
+    if bucket_name:
+        # Imported here to avoid a circular import.
+        from storage_utils import run_in_io_thread
+        try:
+            await run_in_io_thread(storage_client.get_bucket, bucket_name)
+        except Exception as e:
+            logging.warning(f"Could not pre-warm Storage client: {e}")
+    logging.info("Clients are ready.")
@@ -0,0 +1,426 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Content-addressed cache of media generation results.
+
+Maps a canonical hash of a generation request (including content hashes
+of the referenced frame images) to the GCS URI of the generated media.
+Concurrent identical requests are coalesced into a single generation.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from google.api_core import exceptions
+from google.cloud.storage import Blob
+
+from media_models import MediaAsset
+from storage_utils import ai_bucket_name, run_in_io_thread, storage_client
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600.0 # 30 days
+DEFAULT_MAX_ENTRIES = 10000
+EVICTION_INTERVAL = 600.0 # Run eviction at most once per 10 minutes
+
+
+@dataclass
+class CacheEntry:
+    uri: str
+    created: float
+    accessed: float
+
+
+class CacheBackend(ABC):
+    """Persistent key-value store of cache entries."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        ...
+
+    @abstractmethod
+    def put(self, key: str, entry: CacheEntry):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def evict(self, ttl_seconds: float, max_entries: int):
+        """Removes expired entries and the least recently used ones
+        above `max_entries`."""
+        ...
+
+
+class SqliteCacheBackend(CacheBackend):
+    """Local SQLite database backend."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, uri TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT uri, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            now = time.time()
+            self._db.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?", (now, key)
+            )
+        return CacheEntry(uri=row[0], created=row[1], accessed=now)
+
+    def put(self, key: str, entry: CacheEntry):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, entry.uri, entry.created, entry.accessed)
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def evict(self, ttl_seconds: float, max_entries: int):
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM entries WHERE created < ?",
+                (time.time() - ttl_seconds,)
+            )
+            self._db.execute(
+                "DELETE FROM entries WHERE key NOT IN ("
+                "SELECT key FROM entries ORDER BY accessed DESC LIMIT ?)",
+                (max_entries,)
+            )
+
+
+class FileCacheBackend(CacheBackend):
+    """Directory of JSON files, one per key. Mostly useful for tests."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            entry = CacheEntry(**json.loads(path.read_text()))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+        entry.accessed = time.time()
+        os.utime(path)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry):
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(entry.__dict__))
+        tmp_path.replace(path)
+
+    def delete(self, key: str):
+        self._path(key).unlink(missing_ok=True)
+
+    def evict(self, ttl_seconds: float, max_entries: int):
+        expire_before = time.time() - ttl_seconds
+        files = []
+        for path in self.directory.glob("*.json"):
+            try:
+                created = json.loads(path.read_text())["created"]
+                accessed = path.stat().st_mtime
+            except (FileNotFoundError, ValueError, KeyError):
+                continue
+            if created < expire_before:
+                path.unlink(missing_ok=True)
+            else:
+                files.append((accessed, path))
+        files.sort(reverse=True)
+        for _, path in files[max_entries:]:
+            path.unlink(missing_ok=True)
+
+
+class GcsCacheBackend(CacheBackend):
+    """Stores entries as metadata of empty marker objects in a GCS bucket.
+    Access times are not tracked, so eviction removes the oldest entries."""
+
+    def __init__(self, bucket_name: str, prefix: str = "cache/generations"):
+        self.bucket = storage_client.bucket(bucket_name)
+        self.prefix = prefix.strip("/")
+
+    def _blob_name(self, key: str) -> str:
+        return f"{self.prefix}/{key}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        blob = self.bucket.get_blob(self._blob_name(key))
+        if not blob or not blob.metadata or "uri" not in blob.metadata:
+            return None
+        return CacheEntry(
+            uri=blob.metadata["uri"],
+            created=float(blob.metadata.get("created", 0)),
+            accessed=time.time(),
+        )
+
+    def put(self, key: str, entry: CacheEntry):
+        blob = self.bucket.blob(self._blob_name(key))
+        blob.metadata = {"uri": entry.uri, "created": str(entry.created)}
+        blob.upload_from_string(b"", content_type="application/octet-stream")
+
+    def delete(self, key: str):
+        try:
+            self.bucket.delete_blob(self._blob_name(key))
+        except exceptions.NotFound:
+            pass
+
+    def evict(self, ttl_seconds: float, max_entries: int):
+        expire_before = time.time() - ttl_seconds
+        blobs = []
+        for blob in storage_client.list_blobs(
+            self.bucket, prefix=f"{self.prefix}/"
+        ):
+            created = blob.time_created.timestamp() if blob.time_created else 0
+            if created < expire_before:
+                blob.delete()
+            else:
+                blobs.append((created, blob))
+        blobs.sort(key=lambda b: b[0], reverse=True)
+        for _, blob in blobs[max_entries:]:
+            blob.delete()
+
+
+def create_backend(uri: str) -> Optional[CacheBackend]:
+    """Creates a cache backend from a URI.
+
+    Supported URIs are "sqlite:///path/to/cache.db", "file:///path/to/dir",
+    "gs://bucket/prefix". "none" disables the cache.
+    """
+    if not uri or uri.lower() == "none":
+        return None
+    if uri.startswith("sqlite://"):
+        return SqliteCacheBackend(uri[len("sqlite://"):])
+    if uri.startswith("file://"):
+        return FileCacheBackend(uri[len("file://"):])
+    if uri.startswith("gs://"):
+        bucket_name, _, prefix = uri[len("gs://"):].partition("/")
+        return GcsCacheBackend(bucket_name, prefix or "cache/generations")
+    raise ValueError(f"Unsupported generation cache URI: {uri}")
+
+
+def _gcs_content_hash(uri: str) -> str:
+    """Returns the content hash of a GCS object from its metadata."""
+    blob = Blob.from_string(uri, client=storage_client)
+    blob.reload(client=storage_client)
+    if blob.md5_hash:
+        return f"md5:{blob.md5_hash}"
+    # Composite objects don't have MD5 hashes.
+    return f"crc32c:{blob.crc32c}"
+
+
+def _gcs_uri_exists(uri: str) -> bool:
+    return Blob.from_string(uri, client=storage_client).exists(
+        client=storage_client
+    )
+
+
+@dataclass
+class _InFlight:
+    """A shared generation and the number of callers waiting for it."""
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class GenerationCache:
+    """Caches generation results and coalesces identical in-flight requests."""
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend],
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._last_eviction = 0.0
+
+    async def make_key(
+        self,
+        tool_name: str,
+        params: Dict[str, Any],
+        frame_uris: Optional[Dict[str, Optional[str]]] = None,
+    ) -> str:
+        """Computes a canonical hash of a generation request.
+
+        Args:
+            tool_name (str): Name of the generation tool.
+            params (Dict[str, Any]): All request parameters
+                that affect the result, including the model name.
+            frame_uris (Optional[Dict[str, Optional[str]]], optional):
+                GCS URIs of referenced images. They are keyed
+                by their content hashes, not by their URIs.
+
+        Returns:
+            str: hex digest of the request.
+        """
+        frames = {}
+        for name, uri in (frame_uris or {}).items():
+            if not uri:
+                continue
+            try:
+                frames[name] = await run_in_io_thread(_gcs_content_hash, uri)
+            except exceptions.NotFound:
+                frames[name] = f"uri:{uri}"
+        canonical = json.dumps(
+            {"tool": tool_name, "params": params, "frames": frames},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[MediaAsset]],
+        force: bool = False,
+    ) -> MediaAsset:
+        """Returns a cached result for `key` or runs `generate`.
+
+        Concurrent calls with the same key share a single generation.
+        The generation is cancelled only when all callers are cancelled.
+        With `force`, the cached result is ignored and replaced
+        by a new generation that isn't shared.
+        """
+        if self.backend is None:
+            return await generate()
+        if force:
+            return await self._lookup_or_generate(key, generate, lookup=False)
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            in_flight = _InFlight(
+                asyncio.create_task(self._lookup_or_generate(key, generate))
+            )
+            self._in_flight[key] = in_flight
+            in_flight.task.add_done_callback(
+                lambda _: self._forget(key, in_flight)
+            )
+        else:
+            logging.info(f"Joining in-flight generation {key}.")
+        # The count lives with the task, so it is still there when the task
+        # has finished and been forgotten before a cancelled caller resumes.
+        in_flight.waiters += 1
+        try:
+            return (await asyncio.shield(in_flight.task)).model_copy()
+        except asyncio.CancelledError:
+            in_flight.waiters -= 1
+            if in_flight.waiters == 0 and not in_flight.task.done():
+                in_flight.task.cancel()
+            raise
+
+    def _forget(self, key: str, in_flight: _InFlight):
+        if self._in_flight.get(key) is in_flight:
+            del self._in_flight[key]
+
+    async def _lookup(self, key: str) -> Optional[MediaAsset]:
+        entry = await run_in_io_thread(self.backend.get, key) # type: ignore
+        if entry and time.time() - entry.created < self.ttl_seconds:
+            if await run_in_io_thread(_gcs_uri_exists, entry.uri):
+                logging.info(f"Cache hit {key}: {entry.uri}")
+                return MediaAsset(uri=entry.uri)
+        if entry:
+            await run_in_io_thread(self.backend.delete, key) # type: ignore
+        return None
+
+    async def _lookup_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[MediaAsset]],
+        lookup: bool = True,
+    ) -> MediaAsset:
+        # The cache must never fail a generation: backend errors are
+        # logged, failed lookups are misses and failed stores are skipped.
+        if lookup:
+            try:
+                cached = await self._lookup(key)
+            except Exception as e:
+                cached = None
+                logging.warning(
+                    f"Generation cache lookup of {key} failed: {e}"
+                )
+            if cached:
+                return cached
+        asset = await generate()
+        if asset.uri and not asset.error:
+            now = time.time()
+            try:
+                await run_in_io_thread(
+                    self.backend.put, # type: ignore
+                    key,
+                    CacheEntry(uri=asset.uri, created=now, accessed=now)
+                )
+            except Exception as e:
+                logging.warning(
+                    f"Generation cache store of {key} failed: {e}"
+                )
+            await self._maybe_evict()
+        return asset
+
+    async def _maybe_evict(self):
+        now = time.time()
+        if now - self._last_eviction < EVICTION_INTERVAL:
+            return
+        self._last_eviction = now
+        try:
+            await run_in_io_thread(
+                self.backend.evict, # type: ignore
+                self.ttl_seconds,
+                self.max_entries
+            )
+        except Exception as e:
+            logging.warning(f"Generation cache eviction failed: {e}")
+
+
+generation_cache = GenerationCache(
+    backend=create_backend(
+        os.environ.get(
+            "GENERATION_CACHE_URI",
+            f"gs://{ai_bucket_name}/cache/generations"
+        )
+    ),
+    ttl_seconds=float(
+        os.environ.get("GENERATION_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+    ),
+    max_entries=int(
+        os.environ.get("GENERATION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+    ),
+)
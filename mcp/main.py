@@ -13,15 +13,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from contextlib import asynccontextmanager
 import logging
 import os
 import sys
 
 from fastmcp import FastMCP
 from dotenv import load_dotenv
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
+from clients import prewarm_clients
 from nano_banana import generate_image
-from veo3 import generate_video
+from storage_utils import ai_bucket_name
+from veo3 import generate_video, operation_poller
 
 def _initialize_console_logging(min_level: int = logging.INFO):
     """Initializes Python root logger making sure Debug and Info
@@ -46,12 +51,26 @@ def _initialize_console_logging(min_level: int = logging.INFO):
     )
 
 
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Pre-warms pooled clients before serving requests."""
+    await prewarm_clients(ai_bucket_name)
+    yield
+
+
 tools = [generate_image, generate_video]
 mcp = FastMCP(
     name="MediaGenerators",
-    tools=tools
+    tools=tools,
+    lifespan=lifespan,
 )
 
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> JSONResponse:
+    """Returns media generation metrics."""
+    return JSONResponse({"operation_poller": operation_poller.get_metrics()})
+
 if __name__ == "__main__":
     load_dotenv()
     _initialize_console_logging()
@@ -12,25 +12,34 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
 import mimetypes
+import os
 from typing import Literal, Optional
 
-from google.adk.models.google_llm import Gemini
-
 from google.genai import types
 
+from clients import get_genai_client
+from generation_cache import generation_cache
 from media_models import MediaAsset
+from retry_utils import backoff_delay, is_retryable_error
 from storage_utils import upload_data_to_gcs
 
 AUTHORIZED_URI = "https://storage.mtls.cloud.google.com/"
 MAX_RETRIES = 5
+IMAGE_MODEL = "gemini-2.5-flash-image"
+# Deadline for a generate_image call, including all retries.
+IMAGE_GENERATION_DEADLINE = float(
+    os.environ.get("IMAGE_GENERATION_DEADLINE", "180")
+)
 
 
 async def generate_image(
     prompt: str,
     source_image_gsc_uri: Optional[str] = None,
     aspect_ratio: Literal["16:9", "9:16"] = "16:9",
+    skip_cache: bool = False,
 ) -> MediaAsset:
     """Generates an image using Gemini 2.5 Flash Image model (aka Nano Banana).
     Returns a MediaAsset object with the GCS URI of the generated image or an error text.
@@ -42,13 +51,35 @@ async def generate_image(
             Defaults to None.
         aspect_ratio (str, optional): Aspect ratio of the video.
             Supported values are "16:9" and "9:16". Defaults to "16:9".
+        skip_cache (bool, optional): Generate a new image instead of
+            reusing the cached result of an identical request, and
+            replace the cached result. Defaults to False.
 
     Returns:
         MediaAsset: object with the GCS URI of the generated image or an error text.
     """
+    cache_key = await generation_cache.make_key(
+        "generate_image",
+        {
+            "model": IMAGE_MODEL,
+            "prompt": prompt,
+            "aspect_ratio": aspect_ratio,
+        },
+        frame_uris={"source_image": source_image_gsc_uri},
+    )
+    return await generation_cache.get_or_generate(
+        cache_key,
+        lambda: _generate_image(prompt, source_image_gsc_uri, aspect_ratio),
+        force=skip_cache,
+    )
+
 
-    gemini_client = Gemini()
-    genai_client = gemini_client.api_client
+async def _generate_image(
+    prompt: str,
+    source_image_gsc_uri: Optional[str],
+    aspect_ratio: Literal["16:9", "9:16"],
+) -> MediaAsset:
+    genai_client = get_genai_client()
     content = types.Content(
         parts=[types.Part.from_text(text=prompt)],
         role="user"
@@ -65,43 +96,79 @@ async def generate_image(
         )
 
     asset = MediaAsset(uri="")
-    for _ in range (0, MAX_RETRIES):
-        response = genai_client.models.generate_content(
-            model="gemini-2.5-flash-image",
-            contents=[content],
-            config=types.GenerateContentConfig(
-                response_modalities=["IMAGE"],
-                image_config=types.ImageConfig(
-                    aspect_ratio=aspect_ratio,
-                )
-            )
-        )
-        response_text = ""
-        if response and response.parts:
-            for part in response.parts:
-                if part.text and not part.thought:
-                    response_text += part.text
-                if part.file_data and part.file_data.file_uri:
-                    asset = MediaAsset(uri=part.file_data.file_uri)
-                    break
-                if part.inline_data and part.inline_data.data:
-                    gcs_uri = await upload_data_to_gcs(
-                        "mcp-tools",
-                        part.inline_data.data,
-                        part.inline_data.mime_type # type: ignore
+    last_error: Optional[Exception] = None
+    # Task cancellation (e.g. when the MCP client disconnects) propagates
+    # into the `aio` call and aborts the upstream request.
+    try:
+        async with asyncio.timeout(IMAGE_GENERATION_DEADLINE):
+            for attempt in range(0, MAX_RETRIES):
+                if attempt > 0:
+                    await asyncio.sleep(backoff_delay(attempt - 1))
+                try:
+                    response = await genai_client.aio.models.generate_content(
+                        model=IMAGE_MODEL,
+                        contents=[content],
+                        config=types.GenerateContentConfig(
+                            response_modalities=["IMAGE"],
+                            image_config=types.ImageConfig(
+                                aspect_ratio=aspect_ratio,
+                            )
+                        )
                     )
-                    asset = MediaAsset(uri=gcs_uri)
+                except Exception as e:
+                    if not is_retryable_error(e):
+                        asset.error = f"Image generation failed: {e}"
+                        logging.error(asset.error)
+                        return asset
+                    logging.warning(
+                        f"Image generation attempt {attempt + 1} failed: {e}"
+                    )
+                    last_error = e
+                    continue
+                last_error = None
+                asset = await _extract_image(response)
+                if asset.uri:
                     break
-        if asset.uri:
-            break
-        if response_text:
-            logging.warning(f"MODEL RESPONSE: \n{response_text}")
+    except TimeoutError:
+        asset.error = (
+            f"Image generation timed out after {IMAGE_GENERATION_DEADLINE} seconds."
+        )
+        logging.error(asset.error)
 
     if not asset.uri:
-        asset.error = "No image was generated."
+        if not asset.error and last_error:
+            asset.error = (
+                f"Image generation failed after {MAX_RETRIES} attempts: "
+                f"{last_error}"
+            )
+            logging.error(asset.error)
+        asset.error = asset.error or "No image was generated."
     else:
         logging.info(
             f"Image URL: {asset.uri.replace('gs://', AUTHORIZED_URI)}"
         )
     return asset
 
+
+async def _extract_image(
+    response: types.GenerateContentResponse
+) -> MediaAsset:
+    """Extracts the generated image from a model response,
+    uploading inline image data to GCS."""
+    response_text = ""
+    if response and response.parts:
+        for part in response.parts:
+            if part.text and not part.thought:
+                response_text += part.text
+            if part.file_data and part.file_data.file_uri:
+                return MediaAsset(uri=part.file_data.file_uri)
+            if part.inline_data and part.inline_data.data:
+                gcs_uri = await upload_data_to_gcs(
+                    "mcp-tools",
+                    part.inline_data.data,
+                    part.inline_data.mime_type # type: ignore
+                )
+                return MediaAsset(uri=gcs_uri)
+    if response_text:
+        logging.warning(f"MODEL RESPONSE: \n{response_text}")
+    return MediaAsset(uri="")
@@ -0,0 +1,311 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Shared poller of long-running operations.
+
+One background task tracks all outstanding operations. Each operation is
+polled on a schedule derived from the observed distribution of operation
+durations: sparsely until the fastest operations usually finish, densely
+around the expected completion time, and with a growing interval after
+the slowest ones usually finish.
+
+Every poll runs as its own task with a timeout, and an operation has at
+most one poll in flight, so a hung request only delays its own operation.
+If the background task stops, all outstanding waiters fail.
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import logging
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+MIN_POLL_INTERVAL = 1.0
+MAX_POLL_INTERVAL = 30.0
+DEFAULT_EXPECTED_DURATION = 75.0 # Typical Veo generation time in seconds.
+DURATION_HISTORY_SIZE = 100
+MAX_CONSECUTIVE_ERRORS = 5
+POLL_TIMEOUT = 30.0
+
+
+@dataclass
+class _TrackedOperation:
+    operation: Any
+    started: float
+    future: asyncio.Future
+    next_poll: float
+    last_poll: float
+    errors: int = 0
+
+
+@dataclass
+class PollerMetrics:
+    poll_count: int = 0
+    poll_errors: int = 0
+    completed: int = 0
+    # Time between the last "not done" poll and the poll
+    # that detected completion, i.e. an upper bound of the detection lag.
+    detection_lags: Deque[float] = field(
+        default_factory=lambda: deque(maxlen=DURATION_HISTORY_SIZE)
+    )
+
+
+def _quantile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    position = q * (len(values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class OperationPoller:
+    """Polls all outstanding operations from a single background task."""
+
+    def __init__(
+        self,
+        get_operation: Callable[[Any], Awaitable[Any]],
+        min_interval: float = MIN_POLL_INTERVAL,
+        max_interval: float = MAX_POLL_INTERVAL,
+        expected_duration: float = DEFAULT_EXPECTED_DURATION,
+        poll_timeout: float = POLL_TIMEOUT,
+    ):
+        """
+        Args:
+            get_operation (Callable[[Any], Awaitable[Any]]): Coroutine function
+                that returns the refreshed operation.
+            min_interval (float, optional): Minimum interval between polls
+                of the same operation. Defaults to MIN_POLL_INTERVAL.
+            max_interval (float, optional): Maximum interval between polls
+                of the same operation. Defaults to MAX_POLL_INTERVAL.
+            expected_duration (float, optional): Expected operation duration
+                used until actual durations are observed.
+                Defaults to DEFAULT_EXPECTED_DURATION.
+            poll_timeout (float, optional): Timeout of a single poll,
+                counted as a failed poll. Defaults to POLL_TIMEOUT.
+        """
+        self._get_operation = get_operation
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.expected_duration = expected_duration
+        self.poll_timeout = poll_timeout
+        self.metrics = PollerMetrics()
+        self._durations: Deque[float] = deque(maxlen=DURATION_HISTORY_SIZE)
+        self._operations: Dict[int, _TrackedOperation] = {}
+        # Polls in flight, by operation key.
+        self._polls: Dict[int, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait(self, operation: Any) -> Any:
+        """Waits for an operation to complete.
+
+        Args:
+            operation (Any): Operation object with a `done` attribute.
+
+        Returns:
+            Any: the completed operation.
+        """
+        if operation.done:
+            return operation
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        tracked = _TrackedOperation(
+            operation=operation,
+            started=now,
+            future=loop.create_future(),
+            next_poll=now + self._next_interval(0.0),
+            last_poll=now,
+        )
+        key = id(tracked)
+        self._operations[key] = tracked
+        self._ensure_running()
+        self._wakeup.set() # type: ignore
+        try:
+            return await tracked.future
+        finally:
+            self._operations.pop(key, None)
+            poll = self._polls.pop(key, None)
+            if poll:
+                poll.cancel()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Returns poller metrics as a JSON-serializable dictionary."""
+        lags = list(self.metrics.detection_lags)
+        durations = list(self._durations)
+        return {
+            "outstanding_operations": len(self._operations),
+            "poll_count": self.metrics.poll_count,
+            "poll_errors": self.metrics.poll_errors,
+            "completed_operations": self.metrics.completed,
+            "detection_lag_mean_seconds": (
+                statistics.fmean(lags) if lags else None
+            ),
+            "detection_lag_max_seconds": max(lags) if lags else None,
+            "operation_duration_p50_seconds": (
+                _quantile(durations, 0.5) if durations else None
+            ),
+            "operation_duration_p90_seconds": (
+                _quantile(durations, 0.9) if durations else None
+            ),
+        }
+
+    def _expected_window(self):
+        """Returns (early, median, late) expected completion times."""
+        if len(self._durations) >= 3:
+            durations = list(self._durations)
+            return (
+                _quantile(durations, 0.1),
+                _quantile(durations, 0.5),
+                _quantile(durations, 0.9),
+            )
+        return (
+            self.expected_duration * 0.6,
+            self.expected_duration,
+            self.expected_duration * 1.6,
+        )
+
+    def _next_interval(self, elapsed: float) -> float:
+        """Computes the delay before the next poll of an operation
+        that has been running for `elapsed` seconds."""
+        early, median, late = self._expected_window()
+        if elapsed < early:
+            # Sparse: jump close to the earliest expected completion.
+            interval = early - elapsed
+        elif elapsed < late:
+            # Dense: poll often within the bulk of the distribution,
+            # most often around the median.
+            spread = max(late - early, self.min_interval)
+            distance = abs(elapsed - median) / spread
+            interval = self.min_interval * (1.0 + 4.0 * distance)
+        else:
+            # Overdue: back off proportionally to the overrun.
+            interval = self.min_interval + (elapsed - late) / 4.0
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        # Waiters must not hang on a poller that is gone.
+        try:
+            await self._run_loop()
+        except asyncio.CancelledError:
+            self._fail_outstanding(None)
+            raise
+        except Exception as e:
+            # The next `wait` starts a new task.
+            logging.exception("Operation poller stopped.")
+            self._fail_outstanding(e)
+        finally:
+            for poll in list(self._polls.values()):
+                poll.cancel()
+
+    def _fail_outstanding(self, error: Optional[Exception]):
+        """Fails all outstanding waiters, or cancels them without error."""
+        for tracked in list(self._operations.values()):
+            if tracked.future.done():
+                continue
+            if error is None:
+                tracked.future.cancel()
+            else:
+                tracked.future.set_exception(
+                    RuntimeError(f"Operation poller stopped: {error}")
+                )
+
+    async def _run_loop(self):
+        while True:
+            self._wakeup.clear() # type: ignore
+            # Operations without a poll in flight.
+            idle = {
+                key: op for key, op in self._operations.items()
+                if key not in self._polls and not op.future.done()
+            }
+            if not idle:
+                await self._wakeup.wait() # type: ignore
+                continue
+            now = time.monotonic()
+            next_poll = min(op.next_poll for op in idle.values())
+            if next_poll > now:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), # type: ignore
+                        timeout=next_poll - now
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for key, op in idle.items():
+                if op.next_poll <= now:
+                    self._start_poll(key, op)
+
+    def _start_poll(self, key: int, tracked: _TrackedOperation):
+        poll = asyncio.create_task(self._poll(tracked))
+        self._polls[key] = poll
+        poll.add_done_callback(
+            lambda _: self._on_poll_done(key, tracked, poll)
+        )
+
+    def _on_poll_done(
+        self,
+        key: int,
+        tracked: _TrackedOperation,
+        poll: asyncio.Task
+    ):
+        if self._polls.get(key) is poll:
+            del self._polls[key]
+        if (
+            not poll.cancelled()
+            and poll.exception()
+            and not tracked.future.done()
+        ):
+            tracked.future.set_exception(poll.exception()) # type: ignore
+        # Schedule the next poll of the operation.
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def _poll(self, tracked: _TrackedOperation):
+        self.metrics.poll_count += 1
+        try:
+            operation = await asyncio.wait_for(
+                self._get_operation(tracked.operation),
+                timeout=self.poll_timeout
+            )
+        except Exception as e:
+            self.metrics.poll_errors += 1
+            tracked.errors += 1
+            logging.warning(f"Operation poll failed ({tracked.errors}): {e!r}")
+            if tracked.errors >= MAX_CONSECUTIVE_ERRORS:
+                if not tracked.future.done():
+                    tracked.future.set_exception(e)
+                return
+            tracked.next_poll = time.monotonic() + min(
+                self.min_interval * 2 ** tracked.errors,
+                self.max_interval
+            )
+            return
+        now = time.monotonic()
+        tracked.errors = 0
+        if operation.done:
+            self._durations.append(now - tracked.started)
+            self.metrics.completed += 1
+            self.metrics.detection_lags.append(now - tracked.last_poll)
+            if not tracked.future.done():
+                tracked.future.set_result(operation)
+            return
+        tracked.operation = operation
+        tracked.last_poll = now
+        tracked.next_poll = now + self._next_interval(now - tracked.started)
@@ -0,0 +1,39 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+import httpx
+from google.genai import errors
+
+BACKOFF_BASE = 1.0 # seconds
+BACKOFF_MAX = 30.0 # seconds
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = BACKOFF_BASE,
+    maximum: float = BACKOFF_MAX
+) -> float:
+    """Returns a "full jitter" exponential backoff delay
+    before retry number `attempt` (starting from 0)."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Checks if a failed API call can be retried."""
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TransportError, ConnectionError))
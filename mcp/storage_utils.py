@@ -12,46 +12,187 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import hashlib
+import io
 import mimetypes
 import os
+from typing import Any, BinaryIO, Callable, Set, TypeVar, Union
 
+from google.api_core import exceptions
 import google.auth
 from google.genai import types
-from google.cloud.storage import Client, Blob
+from google.cloud.storage import Blob
 
 from dotenv import load_dotenv
 
+from clients import get_storage_client
+
 load_dotenv()
 _, project_id = google.auth.default()
 os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id) # type: ignore
 os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
 os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
 
+# Number of threads for blocking GCS I/O.
+GCS_IO_THREADS = int(os.environ.get("GCS_IO_THREADS", "16"))
+# Payloads larger than this are transferred in chunks of this size.
+TRANSFER_CHUNK_SIZE = 8 * 1024 * 1024 # 8 MB
+
+T = TypeVar("T")
+
 project_id = os.environ["GOOGLE_CLOUD_PROJECT"]
-storage_client = Client(project=os.environ.get("GOOGLE_CLOUD_PROJECT"))
+storage_client = get_storage_client()
 ai_bucket_name = os.environ.get(
     "AI_ASSETS_BUCKET",
     f"{project_id}-adk-video-agent"
 )
 ai_bucket = storage_client.get_bucket(ai_bucket_name)
-md5_hash = hashlib.md5()
+HASH_CHUNK_SIZE = TRANSFER_CHUNK_SIZE
+# Names of blobs known to exist in the AI assets bucket.
+_known_blob_names: Set[str] = set()
+_io_executor = ThreadPoolExecutor(
+    max_workers=GCS_IO_THREADS,
+    thread_name_prefix="gcs-io"
+)
+
+
+async def run_in_io_thread(
+    func: Callable[..., T],
+    *args: Any,
+    **kwargs: Any
+) -> T:
+    """Runs a blocking GCS I/O function in the bounded I/O thread pool,
+    so it doesn't block the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _io_executor,
+        functools.partial(func, *args, **kwargs)
+    )
+
+
+def compute_content_hash(
+    data: Union[bytes, BinaryIO],
+    chunk_size: int = HASH_CHUNK_SIZE
+) -> str:
+    """Computes MD5 hex digest of a payload, reading it in chunks.
+
+    Args:
+        data (Union[bytes, BinaryIO]): Payload bytes or a binary file object.
+            File objects are read from the current position to the end.
+        chunk_size (int, optional): Chunk size in bytes.
+            Defaults to HASH_CHUNK_SIZE.
+
+    Returns:
+        str: MD5 hex digest of the payload.
+    """
+    md5_hash = hashlib.md5()
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        view = memoryview(data)
+        for offset in range(0, len(view), chunk_size):
+            md5_hash.update(view[offset:offset + chunk_size])
+    else:
+        for chunk in iter(lambda: data.read(chunk_size), b""):
+            md5_hash.update(chunk)
+    return md5_hash.hexdigest()
+
+
+async def upload_data_to_gcs(
+    agent_id: str,
+    data: Union[bytes, BinaryIO],
+    mime_type: str
+) -> str:
+    """Uploads a payload to the AI assets bucket under its content hash.
+    If an object with the same content already exists, returns its URI
+    without uploading.
 
+    Args:
+        agent_id (str): Agent id used as a folder name.
+        data (Union[bytes, BinaryIO]): Payload bytes or a seekable
+            binary file object.
+        mime_type (str): Payload MIME type.
 
-async def upload_data_to_gcs(agent_id: str, data: bytes, mime_type: str) -> str:
-    md5_hash.update(data)
-    file_name = md5_hash.hexdigest()
+    Returns:
+        str: GCS URI of the object.
+    """
+    return await run_in_io_thread(
+        upload_data_to_gcs_sync,
+        agent_id,
+        data,
+        mime_type
+    )
+
+
+def upload_data_to_gcs_sync(
+    agent_id: str,
+    data: Union[bytes, BinaryIO],
+    mime_type: str
+) -> str:
+    """Blocking version of `upload_data_to_gcs`."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        stream = io.BytesIO(data)
+    else:
+        stream = data
+    start_position = stream.tell()
+    file_name = compute_content_hash(stream)
+    size = stream.tell() - start_position
     ext = mimetypes.guess_extension(mime_type) or ""
     file_name = f"{file_name}{ext}"
     blob_name = f"assets/{agent_id}/{file_name}"
-    blob = Blob(bucket=ai_bucket, name=blob_name)
-    blob.upload_from_string(data, content_type=mime_type, client=storage_client)
     gcs_url = f"gs://{ai_bucket_name}/{blob_name}"
+    if blob_name in _known_blob_names:
+        return gcs_url
+    blob = Blob(bucket=ai_bucket, name=blob_name)
+    if size > TRANSFER_CHUNK_SIZE:
+        blob.chunk_size = TRANSFER_CHUNK_SIZE
+    if not blob.exists(client=storage_client):
+        stream.seek(start_position)
+        try:
+            # if_generation_match=0 makes the upload fail
+            # if the object was created after the check above.
+            blob.upload_from_file(
+                stream,
+                size=size,
+                content_type=mime_type,
+                client=storage_client,
+                if_generation_match=0,
+            )
+        except exceptions.PreconditionFailed:
+            pass
+    _known_blob_names.add(blob_name)
     return gcs_url
 
-def download_data_from_gcs(url: str) -> types.Blob:
+
+async def download_data_from_gcs(url: str) -> types.Blob:
+    """Downloads a GCS object without blocking the event loop."""
+    return await run_in_io_thread(download_data_from_gcs_sync, url)
+
+
+async def download_gcs_to_file(url: str, file_obj: BinaryIO) -> Blob:
+    """Streams a GCS object into a file object in chunks,
+    without blocking the event loop.
+
+    Returns:
+        Blob: the downloaded blob with its metadata.
+    """
+    return await run_in_io_thread(_download_gcs_to_file_sync, url, file_obj)
+
+
+def _download_gcs_to_file_sync(url: str, file_obj: BinaryIO) -> Blob:
     blob = Blob.from_string(url, client=storage_client)
-    blob_data = blob.download_as_bytes(client=storage_client)
+    blob.reload(client=storage_client)
+    if blob.size and blob.size > TRANSFER_CHUNK_SIZE:
+        blob.chunk_size = TRANSFER_CHUNK_SIZE
+    blob.download_to_file(file_obj, client=storage_client)
+    return blob
+
+
+def download_data_from_gcs_sync(url: str) -> types.Blob:
+    """Blocking version of `download_data_from_gcs`."""
+    buffer = io.BytesIO()
+    blob = _download_gcs_to_file_sync(url, buffer)
+    blob_data = buffer.getvalue()
     file_name = url.split("/")[-1]
     mime_type = (
         mimetypes.guess_type(file_name)[0]
@@ -12,23 +12,35 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import asyncio
 import json
 import logging
 import mimetypes
+import random
 import time
 from typing import Literal, Optional
 import uuid
 
-from google.adk.models.google_llm import Gemini
-
 from google.genai import types
 
+from clients import get_genai_client
+from generation_cache import generation_cache
 from media_models import MediaAsset
+from operation_poller import OperationPoller
 from storage_utils import ai_bucket_name
 
-OPERATION_WAIT_TIME = 10.0 # 10 seconds between operation status check
 AUTHORIZED_URI = "https://storage.mtls.cloud.google.com/"
+VEO_MODEL = "veo-3.1-generate-preview"
+VIDEO_SEED = 1
+
+
+async def _get_operation(
+    operation: types.GenerateVideosOperation
+) -> types.GenerateVideosOperation:
+    return await get_genai_client().aio.operations.get(operation)
+
+
+# Shared by all generate_video calls.
+operation_poller = OperationPoller(_get_operation)
 
 
 async def generate_video(
@@ -37,6 +49,7 @@ async def generate_video(
     end_frame_image_gsc_uri: Optional[str] = None,
     video_duration_seconds: int = 8,
     aspect_ratio: Literal["16:9", "9:16"] = "16:9",
+    skip_cache: bool = False,
 ) -> MediaAsset:
     """Generates a video using Veo 3 model.
     Returns a MediaAsset object with the GCS URI of the generated video or an error text.
@@ -56,13 +69,51 @@ async def generate_video(
             Defaults to 8.
         aspect_ratio (str, optional): Aspect ratio of the video.
             Supported values are "16:9" and "9:16". Defaults to "16:9".
+        skip_cache (bool, optional): Generate a new video instead of
+            reusing the cached result of an identical request, and
+            replace the cached result. Defaults to False.
 
     Returns:
         MediaAsset: object with the GCS URI of the generated image or an error text.
     """
+    cache_key = await generation_cache.make_key(
+        "generate_video",
+        {
+            "model": VEO_MODEL,
+            "prompt": prompt,
+            "video_duration_seconds": video_duration_seconds,
+            "aspect_ratio": aspect_ratio,
+            "seed": VIDEO_SEED,
+        },
+        frame_uris={
+            "start_frame": start_frame_image_gsc_uri,
+            "end_frame": end_frame_image_gsc_uri,
+        },
+    )
+    return await generation_cache.get_or_generate(
+        cache_key,
+        lambda: _generate_video(
+            prompt,
+            start_frame_image_gsc_uri,
+            end_frame_image_gsc_uri,
+            video_duration_seconds,
+            aspect_ratio,
+            # The fixed seed would reproduce the cached video.
+            random.randrange(2**31) if skip_cache else VIDEO_SEED,
+        ),
+        force=skip_cache,
+    )
+
 
-    gemini_client = Gemini()
-    genai_client = gemini_client.api_client
+async def _generate_video(
+    prompt: str,
+    start_frame_image_gsc_uri: Optional[str],
+    end_frame_image_gsc_uri: Optional[str],
+    video_duration_seconds: int,
+    aspect_ratio: Literal["16:9", "9:16"],
+    seed: int,
+) -> MediaAsset:
+    genai_client = get_genai_client()
     agent_name = "mcp-tool"
     invocation = uuid.uuid4().hex
 
@@ -70,7 +121,7 @@ async def generate_video(
         aspect_ratio=aspect_ratio,
         output_gcs_uri=f"gs://{ai_bucket_name}/{agent_name}",
         number_of_videos=1, # Only one video, otherwise cannot use seed.
-        seed=1, # fix it here to make it _somewhat_ reproducible.
+        seed=seed, # VIDEO_SEED unless skip_cache, _somewhat_ reproducible.
         duration_seconds=video_duration_seconds,
         person_generation="allow_adult",
         # enhance_prompt=True
@@ -91,13 +142,11 @@ async def generate_video(
 
     start = time.time()
     gen_video_op = await genai_client.aio.models.generate_videos(
-        model="veo-3.1-generate-preview",
+        model=VEO_MODEL,
         source=source,
         config=config
     )
-    while not gen_video_op.done:
-        await asyncio.sleep(OPERATION_WAIT_TIME)
-        gen_video_op = await genai_client.aio.operations.get(gen_video_op)
+    gen_video_op = await operation_poller.wait(gen_video_op)
     if gen_video_op.error:
         result_media.error = json.dumps(gen_video_op.error, indent=2)
         logging.error(f"[{invocation}] {result_media.error}")
@@ -15,34 +15,14 @@ GS_PATHS=(
 "gs://indigo-night-483404-q4-video-assets/mcp-tool/2445778051170980322/sample_0.mp4"
 )
 
-echo "Downloading 7 video segments from GCS..."
-
-# Download each segment using gsutil
-for i in "${!GS_PATHS[@]}"; do
-    SEG_NUM=$(printf "%02d" $((i+1)))
-    echo "Downloading segment $SEG_NUM..."
-    gsutil cp "${GS_PATHS[$i]}" "$OUTPUT_DIR/segment_${SEG_NUM}.mp4"
-done
-
-echo ""
-echo "Creating file list for ffmpeg..."
-
-# Create file list for ffmpeg
-cat > "$OUTPUT_DIR/filelist.txt" << 'EOF'
-file 'segment_01.mp4'
-file 'segment_02.mp4'
-file 'segment_03.mp4'
-file 'segment_04.mp4'
-file 'segment_05.mp4'
-file 'segment_06.mp4'
-file 'segment_07.mp4'
-EOF
-
-echo "Merging videos with ffmpeg..."
-
-# Merge all segments (re-encode for consistency)
-cd "$OUTPUT_DIR"
-ffmpeg -y -f concat -safe 0 -i filelist.txt -c:v libx264 -c:a aac -movflags +faststart nova_sat_tutorial_v5.mp4
+echo "Merging ${#GS_PATHS[@]} video segments..."
+
+# Download segments in parallel and merge them.
+# Segments with matching stream parameters are concatenated without re-encoding.
+python3 agents/video_avatar_agent/video_merge.py \
+    --output "$OUTPUT_DIR/nova_sat_tutorial_v5.mp4" \
+    --work-dir "$OUTPUT_DIR" \
+    "${GS_PATHS[@]}"
 
 echo ""
 echo "============================================"
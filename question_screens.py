@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Renders question and answer screens from question records.
+
+A question record looks like:
+    {
+        "id": "sat_system_of_equations",
+        "title": "SAT Math - System of Equations",
+        "equations": ["y = 4x", "y = x² − 12"],
+        "prompt": ["A system of two equations is shown.", "..."],
+        "prompt_lines": {"standalone": ["...", "..."]},
+        "choices": ["−3", "4", "6", "12"],
+        "correct": 2
+    }
+
+The parts shared by both screens (box, header, equations and prompt)
+are rendered once per question. The question screen and the answer
+screen (correct choice highlighted) only redraw the choices region
+and the optional character sprite on top of that base.
+
+`prompt_lines` optionally overrides the prompt's line breaks per layout
+name, for layouts whose box is wider or narrower than the default.
+
+A question bank is a JSON array or a JSON Lines file of records.
+
+Usage:
+    python question_screens.py questions/bank.jsonl --output-dir screens
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from compositor import get_font, plan_layer
+
+VARIANTS = ["question", "answer"]
+CHOICE_LETTERS = "ABCDEFGH"
+BOX_FILL = (248, 249, 250)
+BOX_OUTLINE = (200, 200, 200)
+CORRECT_FILL = (34, 197, 94)
+CORRECT_OUTLINE = (22, 163, 74)
+CORRECT_LABEL = "✓ Correct!"
+
+
+@dataclass(frozen=True)
+class ScreenLayout:
+    """Geometry of a question screen. Box edges are fractions
+    of the canvas, everything else is in pixels."""
+    box: Tuple[float, float, float, float]
+    padding: int
+    header_top: int
+    header_size: int
+    header_color: Tuple[int, int, int]
+    rule_gap: int
+    equation_gap: int
+    equation_size: int
+    equation_spacing: int
+    # Inset from the box's left edge, None to center equations.
+    equation_x: Optional[int]
+    prompt_size: int
+    prompt_spacing: int
+    choice_size: int
+    correct_size: int
+    choice_spacing: int
+    circle_x: int
+    circle_radius: int
+    circle_y: int
+    letter_x: int
+    value_x: int
+    label_x: int
+    section_gap: int = 40
+    # Key of the layout's line breaks in a record's `prompt_lines`.
+    name: str = ""
+    canvas_size: Tuple[int, int] = (1920, 1080)
+    # Sprite per variant and its layer properties, see compositor.py.
+    character: Dict[str, Any] = field(default_factory=dict)
+
+    def __hash__(self):
+        return hash(json.dumps(self.__dict__, sort_keys=True, default=str))
+
+
+LAYOUTS = {
+    # Full-width question box, used as a background for composites.
+    "standalone": ScreenLayout(
+        box=(0.05, 0.08, 0.95, 0.92),
+        padding=60,
+        header_top=40,
+        header_size=42,
+        header_color=(80, 80, 80),
+        rule_gap=70,
+        equation_gap=60,
+        equation_size=56,
+        equation_spacing=80,
+        equation_x=None,
+        prompt_size=36,
+        prompt_spacing=50,
+        choice_size=42,
+        correct_size=48,
+        choice_spacing=80,
+        circle_x=100,
+        circle_radius=24,
+        circle_y=20,
+        letter_x=12,
+        value_x=60,
+        label_x=150,
+        name="standalone",
+    ),
+    # Question box on the right, character on the left.
+    "side": ScreenLayout(
+        box=(0.35, 0.08, 0.95, 0.92),
+        padding=40,
+        header_top=30,
+        header_size=36,
+        header_color=(100, 100, 100),
+        rule_gap=60,
+        equation_gap=40,
+        equation_size=48,
+        equation_spacing=70,
+        equation_x=80,
+        prompt_size=32,
+        prompt_spacing=45,
+        choice_size=36,
+        correct_size=42,
+        choice_spacing=70,
+        circle_x=60,
+        circle_radius=20,
+        circle_y=18,
+        letter_x=10,
+        value_x=50,
+        label_x=130,
+        name="side",
+        character={
+            "question": "nova_waving.png",
+            "answer": "nova_excited_celebrating.png",
+            "width": 0.28,
+            "max_height": 0.85,
+            "anchor": "bottom-left",
+            "offset": [0.02, 0.05],
+        },
+    ),
+}
+
+
+def _box(layout: ScreenLayout) -> Tuple[int, int, int, int]:
+    width, height = layout.canvas_size
+    left, top, right, bottom = layout.box
+    return (
+        int(width * left),
+        int(height * top),
+        int(width * right),
+        int(height * bottom)
+    )
+
+
+def render_base(
+    question: Dict[str, Any],
+    layout: ScreenLayout
+) -> Tuple[Image.Image, int]:
+    """Renders everything both variants of a question share.
+
+    Returns:
+        Tuple[Image.Image, int]: base screen and the y position of
+            the first choice.
+    """
+    width, _ = layout.canvas_size
+    box_left, box_top, box_right, box_bottom = _box(layout)
+    image = Image.new("RGB", layout.canvas_size, (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    draw.rounded_rectangle(
+        [box_left, box_top, box_right, box_bottom],
+        radius=20,
+        fill=BOX_FILL,
+        outline=BOX_OUTLINE,
+        width=2
+    )
+
+    header_y = box_top + layout.header_top
+    draw.text(
+        (box_left + layout.padding, header_y),
+        question["title"],
+        fill=layout.header_color,
+        font=get_font(layout.header_size)
+    )
+    line_y = header_y + layout.rule_gap
+    draw.line(
+        [
+            (box_left + layout.padding, line_y),
+            (box_right - layout.padding, line_y)
+        ],
+        fill=BOX_OUTLINE,
+        width=2
+    )
+
+    equation_font = get_font(layout.equation_size)
+    equation_y = line_y + layout.equation_gap
+    equations = question.get("equations", [])
+    for i, equation in enumerate(equations):
+        if layout.equation_x is None:
+            text_width = draw.textlength(equation, font=equation_font)
+            x = int((width - text_width) / 2)
+        else:
+            x = box_left + layout.equation_x
+        draw.text(
+            (x, equation_y + i * layout.equation_spacing),
+            equation,
+            fill=(0, 0, 0),
+            font=equation_font
+        )
+
+    prompt_y = (
+        equation_y
+        + len(equations) * layout.equation_spacing
+        + layout.section_gap
+    )
+    prompt_font = get_font(layout.prompt_size)
+    prompt = (
+        question.get("prompt_lines", {}).get(layout.name)
+        or question.get("prompt", [])
+    )
+    for i, line in enumerate(prompt):
+        draw.text(
+            (box_left + layout.padding, prompt_y + i * layout.prompt_spacing),
+            line,
+            fill=(0, 0, 0),
+            font=prompt_font
+        )
+    choices_y = prompt_y + (len(prompt) + 1) * layout.prompt_spacing
+    return image, choices_y
+
+
+def _draw_choices(
+    draw: ImageDraw.ImageDraw,
+    question: Dict[str, Any],
+    layout: ScreenLayout,
+    origin: Tuple[int, int],
+    highlight: bool
+):
+    """Draws the choices with their top-left at `origin`. With
+    `highlight`, the correct choice is marked and the others are dimmed."""
+    x0, y0 = origin
+    choice_font = get_font(layout.choice_size)
+    correct_font = get_font(layout.correct_size)
+    radius = layout.circle_radius
+    circle_x = x0 + layout.circle_x
+    for i, value in enumerate(question["choices"]):
+        letter = CHOICE_LETTERS[i]
+        choice_y = y0 + i * layout.choice_spacing
+        circle = [
+            circle_x - radius,
+            choice_y - radius + layout.circle_y,
+            circle_x + radius,
+            choice_y + radius + layout.circle_y
+        ]
+        if not highlight:
+            draw.ellipse(circle, outline=(100, 100, 100), width=2)
+            draw.text((circle_x - layout.letter_x, choice_y), letter,
+                      fill=(100, 100, 100), font=choice_font)
+            draw.text((circle_x + layout.value_x, choice_y), value,
+                      fill=(0, 0, 0), font=choice_font)
+        elif i == question["correct"]:
+            draw.ellipse(circle, fill=CORRECT_FILL, outline=CORRECT_OUTLINE,
+                         width=3)
+            draw.text((circle_x - layout.letter_x, choice_y), letter,
+                      fill=(255, 255, 255), font=choice_font)
+            draw.text((circle_x + layout.value_x, choice_y), value,
+                      fill=CORRECT_FILL, font=correct_font)
+            draw.text((circle_x + layout.label_x, choice_y), CORRECT_LABEL,
+                      fill=CORRECT_FILL, font=correct_font)
+        else:
+            draw.ellipse(circle, outline=(180, 180, 180), width=2)
+            draw.text((circle_x - layout.letter_x, choice_y), letter,
+                      fill=(180, 180, 180), font=choice_font)
+            draw.text((circle_x + layout.value_x, choice_y), value,
+                      fill=(150, 150, 150), font=choice_font)
+
+
+@lru_cache(maxsize=32)
+def _character(
+    image: str,
+    layout: ScreenLayout,
+    assets_dir: str
+) -> Tuple[Image.Image, Tuple[int, int]]:
+    """Decodes and resizes a character sprite once per process."""
+    spec = {**layout.character, "image": image}
+    placement = plan_layer(spec, layout.canvas_size, Path(assets_dir))
+    with Image.open(placement.asset.path) as sprite:
+        sprite = sprite.convert("RGBA").resize(
+            placement.asset.size,
+            Image.Resampling.LANCZOS
+        )
+    return sprite, placement.position
+
+
+def render_screens(
+    question: Dict[str, Any],
+    layout: ScreenLayout,
+    assets_dir: str = "assets"
+) -> Dict[str, Image.Image]:
+    """Renders the question and answer screens of a question.
+
+    Args:
+        question (Dict[str, Any]): Question record.
+        layout (ScreenLayout): Screen layout.
+        assets_dir (str, optional): Directory of character sprites.
+            Defaults to "assets".
+
+    Returns:
+        Dict[str, Image.Image]: screen by variant name.
+    """
+    base, choices_y = render_base(question, layout)
+    box_left, _, box_right, _ = _box(layout)
+    # Choices region, the only part of the box that differs.
+    region = (
+        box_left,
+        choices_y - layout.circle_radius,
+        box_right,
+        layout.canvas_size[1]
+    )
+    characters = {**layout.character, **question.get("character", {})}
+    screens = {}
+    for variant in VARIANTS:
+        overlay = base.crop(region)
+        _draw_choices(
+            ImageDraw.Draw(overlay),
+            question,
+            layout,
+            (0, layout.circle_radius),
+            highlight=variant == "answer"
+        )
+        screen = base.copy()
+        screen.paste(overlay, region[:2])
+        if characters.get(variant):
+            sprite, position = _character(
+                characters[variant],
+                layout,
+                assets_dir
+            )
+            screen.paste(sprite, position, sprite)
+        screens[variant] = screen
+    return screens
+
+
+def load_question_bank(path: str) -> List[Dict[str, Any]]:
+    """Loads question records from a JSON array or a JSON Lines file."""
+    with open(path, encoding="utf-8") as f:
+        if Path(path).suffix.lower() == ".jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+def render_question(
+    question: Dict[str, Any],
+    layout_name: str,
+    output_dir: str,
+    output_format: str = "PNG",
+    assets_dir: str = "assets",
+    compress_level: int = 6,
+) -> Dict[str, Any]:
+    """Renders and saves the screens of a question as
+    `<id>_question.<ext>` and `<id>_answer.<ext>`.
+
+    Returns:
+        Dict[str, Any]: question ID, output paths and render time.
+    """
+    start = time.perf_counter()
+    extension = "jpg" if output_format.upper() == "JPEG" else "png"
+    settings = (
+        {"quality": 95} if output_format.upper() == "JPEG"
+        else {"compress_level": compress_level}
+    )
+    outputs = {}
+    screens = render_screens(question, LAYOUTS[layout_name], assets_dir)
+    for variant, screen in screens.items():
+        path = os.path.join(
+            output_dir,
+            f"{question['id']}_{variant}.{extension}"
+        )
+        screen.save(path, output_format.upper(), **settings)
+        outputs[variant] = path
+    return {
+        "id": question["id"],
+        "outputs": outputs,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def render_bank(
+    questions: List[Dict[str, Any]],
+    layout_name: str,
+    output_dir: str,
+    output_format: str = "PNG",
+    assets_dir: str = "assets",
+    workers: int = 1,
+    compress_level: int = 6,
+) -> List[Dict[str, Any]]:
+    """Renders all questions of a question bank, optionally in a
+    process pool. Fonts and sprites are cached per worker.
+
+    Returns:
+        List[Dict[str, Any]]: results of render_question, in bank order.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    args = [
+        (
+            question,
+            layout_name,
+            output_dir,
+            output_format,
+            assets_dir,
+            compress_level
+        )
+        for question in questions
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(questions))
+    if workers <= 1:
+        return [render_question(*a) for a in args]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            render_question,
+            *zip(*args),
+            chunksize=max(1, len(questions) // (workers * 4))
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render question and answer screens "
+                    "from a question bank."
+    )
+    parser.add_argument("bank", help="Question bank (JSON or JSON Lines).")
+    parser.add_argument("--output-dir", "-o", default="screens")
+    parser.add_argument(
+        "--layout",
+        choices=list(LAYOUTS),
+        default="standalone"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["PNG", "JPEG"],
+        type=str.upper,
+        default="PNG"
+    )
+    parser.add_argument("--assets-dir", default="assets")
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        default=6,
+        help="PNG compression level (0-9). Encoding dominates render "
+             "time, lower levels are faster but produce larger files."
+    )
+    parser.add_argument(
+        "--workers",
+        "-j",
+        type=int,
+        default=1,
+        help="Worker processes, 0 for all CPU cores."
+    )
+    args = parser.parse_args()
+    questions = load_question_bank(args.bank)
+    start = time.perf_counter()
+    results = render_bank(
+        questions,
+        args.layout,
+        args.output_dir,
+        args.format,
+        args.assets_dir,
+        args.workers,
+        args.compress_level
+    )
+    elapsed = time.perf_counter() - start
+    screens = sum(len(result["outputs"]) for result in results)
+    print(
+        f"Rendered {screens} screens for {len(results)} questions "
+        f"in {elapsed:.2f}s ({screens / elapsed * 60:.0f} screens/min)"
+    )
+
+
+if __name__ == "__main__":
+    main()